@@ -1,16 +1,27 @@
 import pygame
+import argparse
 import math
 import sys
 import colorsys
+import os
 import random
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recorder import Recorder, Replay, ReplayControls
+from rotating_polygon import RotatingPolygon
+from starfield import Starfield
+from trails import Trails
+from video_export import ExportClock, VideoExporter, use_dummy_display
+
 # ----- Simulation Settings -----
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
-FPS = 60
+FPS = 60  # render rate
+PHYSICS_DT = 1 / 60  # fixed physics step (s), independent of the render rate
+MAX_CATCH_UP_STEPS = 5  # physics steps allowed per rendered frame
 
 # Physics parameters (tweak these for different behavior)
 GRAVITY = 500  # pixels/s^2
-AIR_FRICTION = 0.999  # simple air drag each frame
+AIR_FRICTION = 0.999  # simple air drag each physics step
 RESTITUTION = 0.9  # How "bouncy" the collisions are (0 < r <= 1)
 COLLISION_FRICTION = 0.8  # Coefficient to reduce the tangential component on collision
 
@@ -19,9 +30,11 @@ HEX_CENTER = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
 HEX_RADIUS = 250
 hexagon_angle = 0.0  # initial rotation angle (radians)
 HEX_ANGULAR_SPEED = 1.0  # radians/s (constant angular speed)
+hexagon = RotatingPolygon(HEX_CENTER, HEX_RADIUS, 6, hexagon_angle)
 
 # Ball parameters
 ball_radius = 10
+TRAIL_LENGTH = 12  # rendered frames of fading trail behind the ball
 # Start at the center of the screen (inside the hexagon)
 ball_pos = [SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2]
 # Some initial velocity (pixels per second)
@@ -56,188 +69,323 @@ def dot(v1, v2):
     return v1[0] * v2[0] + v1[1] * v2[1]
 
 
-def get_hexagon_vertices(center, radius, angle):
-    """
-    Returns the vertices (as a list of (x,y) tuples) of a regular hexagon
-    with the given center and radius. The hexagon is rotated by "angle" radians.
-    """
-    vertices = []
-    for i in range(6):
-        theta = angle + i * (2 * math.pi / 6)
-        x = center[0] + radius * math.cos(theta)
-        y = center[1] + radius * math.sin(theta)
-        vertices.append((x, y))
-    return vertices
-
-
-def closest_point_on_segment(p, a, b):
-    """
-    For point p and segment ab, returns the point on ab that is closest to p.
-    """
-    ax, ay = a
-    bx, by = b
-    px, py = p
-    abx = bx - ax
-    aby = by - ay
-    ab_length_sq = abx * abx + aby * aby
-    if ab_length_sq == 0:
-        return a  # a and b are the same point
-    t = ((px - ax) * abx + (py - ay) * aby) / ab_length_sq
-    t = max(0, min(1, t))
-    return (ax + t * abx, ay + t * aby)
+# ----- Physics (one fixed step of dt seconds, returns the number of bounces) -----
+def step_physics(dt):
+    global hexagon_angle
+    bounces = 0
+
+    # --- Update Ball Physics ---
+    ball_velocity[1] += GRAVITY * dt
+    ball_velocity[0] *= AIR_FRICTION
+    ball_velocity[1] *= AIR_FRICTION
+    ball_pos[0] += ball_velocity[0] * dt
+    ball_pos[1] += ball_velocity[1] * dt
+
+    # --- Collision Detection and Response ---
+    # Check collisions with each edge of the hexagon
+    hexagon.set_angle(hexagon_angle)
+    for i in range(hexagon.sides):
+        cp = hexagon.closest_point(i, ball_pos)
+        diff = vector_sub(ball_pos, cp)
+        dist = vector_length(diff)
+
+        if dist < ball_radius:
+            # Collision detected: push the ball out and reflect its velocity.
+            penetration = ball_radius - dist
+
+            if dist != 0:
+                normal = vector_normalize(diff)
+            else:
+                # Centre exactly on the wall: push inwards
+                normal = vector_scale(hexagon.normals[i], -1)
+
+            ball_pos[0] += normal[0] * penetration
+            ball_pos[1] += normal[1] * penetration
+
+            # Determine the wall's velocity at the contact point (due to hexagon rotation)
+            r = vector_sub(cp, HEX_CENTER)
+            wall_velocity = (-HEX_ANGULAR_SPEED * r[1], HEX_ANGULAR_SPEED * r[0])
+
+            # Relative velocity (ball velocity relative to the wall)
+            rel_vel = (
+                ball_velocity[0] - wall_velocity[0],
+                ball_velocity[1] - wall_velocity[1],
+            )
+            rel_normal = dot(rel_vel, normal)
 
+            if rel_normal < 0:
+                # Reflect the velocity along the collision normal, applying restitution
+                new_rel_vel = (
+                    rel_vel[0] - (1 + RESTITUTION) * rel_normal * normal[0],
+                    rel_vel[1] - (1 + RESTITUTION) * rel_normal * normal[1],
+                )
 
-# ----- Main Program -----
-def main():
-    global hexagon_angle
+                # Apply friction to the tangential component
+                rel_vel_dot = dot(new_rel_vel, normal)
+                normal_component = vector_scale(normal, rel_vel_dot)
+                tangent_component = vector_sub(new_rel_vel, normal_component)
+                tangent_component = vector_scale(
+                    tangent_component, COLLISION_FRICTION
+                )
+                new_rel_vel = vector_add(normal_component, tangent_component)
 
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Modern Bouncing Ball in a Spinning Hexagon")
-    clock = pygame.time.Clock()
-
-    # Create a trail surface for the ball (with per-pixel alpha) to achieve a glowing trail.
-    ball_trail_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    ball_trail_surface.fill((0, 0, 0, 0))
-
-    # Generate a small star field for a modern animated background.
-    stars = []
-    for _ in range(50):
-        x = random.randint(0, SCREEN_WIDTH)
-        y = random.randint(0, SCREEN_HEIGHT)
-        phase = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(0.5, 2.0)
-        stars.append({"pos": (x, y), "phase": phase, "speed": speed})
-
-    running = True
-    while running:
-        # Calculate delta time (in seconds)
-        dt = clock.tick(FPS) / 1000.0
-
-        # --- Event Handling ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        # --- Update Ball Physics ---
-        ball_velocity[1] += GRAVITY * dt
-        ball_velocity[0] *= AIR_FRICTION
-        ball_velocity[1] *= AIR_FRICTION
-        ball_pos[0] += ball_velocity[0] * dt
-        ball_pos[1] += ball_velocity[1] * dt
-
-        # --- Collision Detection and Response ---
-        # Check collisions with each edge of the hexagon
-        vertices = get_hexagon_vertices(HEX_CENTER, HEX_RADIUS, hexagon_angle)
-        for i in range(len(vertices)):
-            a = vertices[i]
-            b = vertices[(i + 1) % len(vertices)]
-            cp = closest_point_on_segment(ball_pos, a, b)
-            diff = vector_sub(ball_pos, cp)
-            dist = vector_length(diff)
-
-            if dist < ball_radius:
-                # Collision detected: push the ball out and reflect its velocity.
-                penetration = ball_radius - dist
-
-                if dist != 0:
-                    normal = vector_normalize(diff)
-                else:
-                    edge_vec = vector_sub(b, a)
-                    normal = vector_normalize((-edge_vec[1], edge_vec[0]))
+                ball_velocity[0] = new_rel_vel[0] + wall_velocity[0]
+                ball_velocity[1] = new_rel_vel[1] + wall_velocity[1]
+                bounces += 1
 
-                ball_pos[0] += normal[0] * penetration
-                ball_pos[1] += normal[1] * penetration
+    # --- Update the Hexagon's Rotation ---
+    hexagon_angle += HEX_ANGULAR_SPEED * dt
+    return bounces
 
-                # Determine the wall's velocity at the contact point (due to hexagon rotation)
-                r = vector_sub(cp, HEX_CENTER)
-                wall_velocity = (-HEX_ANGULAR_SPEED * r[1], HEX_ANGULAR_SPEED * r[0])
 
-                # Relative velocity (ball velocity relative to the wall)
-                rel_vel = (
-                    ball_velocity[0] - wall_velocity[0],
-                    ball_velocity[1] - wall_velocity[1],
-                )
-                rel_normal = dot(rel_vel, normal)
-
-                if rel_normal < 0:
-                    # Reflect the velocity along the collision normal, applying restitution
-                    new_rel_vel = (
-                        rel_vel[0] - (1 + RESTITUTION) * rel_normal * normal[0],
-                        rel_vel[1] - (1 + RESTITUTION) * rel_normal * normal[1],
-                    )
-
-                    # Apply friction to the tangential component
-                    rel_vel_dot = dot(new_rel_vel, normal)
-                    normal_component = vector_scale(normal, rel_vel_dot)
-                    tangent_component = vector_sub(new_rel_vel, normal_component)
-                    tangent_component = vector_scale(
-                        tangent_component, COLLISION_FRICTION
-                    )
-                    new_rel_vel = vector_add(normal_component, tangent_component)
-
-                    ball_velocity[0] = new_rel_vel[0] + wall_velocity[0]
-                    ball_velocity[1] = new_rel_vel[1] + wall_velocity[1]
-
-        # --- Update the Hexagon's Rotation ---
-        hexagon_angle += HEX_ANGULAR_SPEED * dt
-
-        # --- Dynamic Colors & Background Animations ---
-        elapsed_time = pygame.time.get_ticks() / 1000.0
-
-        # Compute dynamic colors using HSV (cycle hues over time)
-        hue_hex = (elapsed_time * 0.1) % 1.0
-        hexagon_color = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(hue_hex, 1, 1))
-        hue_ball = (elapsed_time * 0.2 + 0.5) % 1.0
-        ball_color = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(hue_ball, 1, 1))
-
-        # --- Drawing ---
-        # Fill the background with black
-        screen.fill((0, 0, 0))
-
-        # Draw the twinkling star field
-        for star in stars:
-            x, y = star["pos"]
-            brightness = 128 + 127 * math.sin(
-                elapsed_time * star["speed"] + star["phase"]
-            )
-            b = max(0, min(255, int(brightness)))
-            pygame.draw.circle(screen, (b, b, b), (x, y), 2)
-
-        # Convert hexagon vertices to integers for drawing
-        int_vertices = [(int(x), int(y)) for (x, y) in vertices]
-
-        # Create a glow effect for the hexagon using a temporary surface with per-pixel alpha
-        glow_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        # Outer glow (thick, translucent edge)
-        glow_color = (hexagon_color[0], hexagon_color[1], hexagon_color[2], 50)
-        pygame.draw.polygon(glow_surface, glow_color, int_vertices, 15)
-        # Middle glow (medium thickness)
-        glow_color = (hexagon_color[0], hexagon_color[1], hexagon_color[2], 100)
-        pygame.draw.polygon(glow_surface, glow_color, int_vertices, 7)
-        # Sharp hexagon outline
-        pygame.draw.polygon(glow_surface, hexagon_color, int_vertices, 3)
-        screen.blit(glow_surface, (0, 0))
-
-        # Update the ball trail surface to create a motion blur (fading old trails)
-        ball_trail_surface.fill((0, 0, 0, 20))
-        # Draw a glowing circle on the trail surface
-        pygame.draw.circle(
-            ball_trail_surface,
-            (ball_color[0], ball_color[1], ball_color[2], 80),
-            (int(ball_pos[0]), int(ball_pos[1])),
-            ball_radius + 4,
-        )
-        # Blit the trail onto the main screen
-        screen.blit(ball_trail_surface, (0, 0))
+def load_state(state):
+    # Set the ball and hexagon from a recorded row
+    global hexagon_angle
+    ball_pos[:] = float(state["x"]), float(state["y"])
+    ball_velocity[:] = float(state["vel_x"]), float(state["vel_y"])
+    hexagon_angle = float(state["angle"])
 
-        # Draw the current ball (crisp circle) on top
-        pygame.draw.circle(
-            screen, ball_color, (int(ball_pos[0]), int(ball_pos[1])), ball_radius
+
+# ----- Main Program -----
+def main():
+    parser = argparse.ArgumentParser(description="Bouncing ball in a spinning hexagon")
+    parser.add_argument(
+        "--dirty-rects",
+        action="store_true",
+        help="Redraw and push only the areas that changed instead of the whole window; "
+        "every star twinkles, so with thousands of stars this saves little",
+    )
+    parser.add_argument(
+        "--stars", type=int, default=50, help="Number of background stars (default: 50)"
+    )
+    parser.add_argument("--seed", type=int, help="Seed for the random star field")
+    parser.add_argument("--record", metavar="PATH", help="Record every physics step to PATH")
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Play back a recording: space pauses, arrows scrub, home/end jump",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="PATH",
+        help="Render offscreen as fast as possible and write a video to PATH",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=60,
+        help="Length of the exported video in seconds (default: 60)",
+    )
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    recorder = None
+    if args.record:
+        recorder = Recorder(
+            args.record,
+            {
+                "script": "cursor-o3-mini/bouncing_ball_hexagon.py",
+                "seed": args.seed,
+                "dt": PHYSICS_DT,
+                "gravity": GRAVITY,
+                "restitution": RESTITUTION,
+                "collision_friction": COLLISION_FRICTION,
+                "angular_speed": HEX_ANGULAR_SPEED,
+            },
         )
+    replay = None
+    if args.replay:
+        replay = Replay(args.replay)
+        controls = ReplayControls(len(replay), jump=FPS)
+        load_state(replay[0])
+
+    if args.export:
+        use_dummy_display()
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Modern Bouncing Ball in a Spinning Hexagon")
 
-        pygame.display.flip()
+    # An export renders frames back to back on video time: every frame is
+    # exactly 1 / FPS after the last, for the physics and the colour cycle
+    exporter = None
+    if args.export:
+        clock = ExportClock(FPS)
+        get_ticks = clock.get_ticks
+        exporter = VideoExporter(args.export, (SCREEN_WIDTH, SCREEN_HEIGHT), FPS, args.duration)
+    else:
+        clock = pygame.time.Clock()
+        get_ticks = pygame.time.get_ticks
+    screen_rect = screen.get_rect()
+
+    # Glowing trail: the ball's recent positions drawn as fading circles
+    trails = Trails(1, TRAIL_LENGTH, ball_radius + 4)
+
+    # Glow layer for the hexagon, allocated once and cleared where it was drawn
+    glow_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+
+    # Generate a star field for a modern animated background.
+    star_x, star_y, star_phase, star_speed = [], [], [], []
+    for _ in range(args.stars):
+        star_x.append(random.randint(0, SCREEN_WIDTH))
+        star_y.append(random.randint(0, SCREEN_HEIGHT))
+        star_phase.append(random.uniform(0, 2 * math.pi))
+        star_speed.append(random.uniform(0.5, 2.0))
+    starfield = Starfield(star_x, star_y, 2, star_phase, star_speed)
+    star_rects = starfield.rects()
+    # A star lies wholly inside a region when its top-left pixel is inside
+    # the region shrunk by the star's size, which collidelistall tests in C
+    star_size = star_rects[0].width if star_rects else 0
+    star_corners = [pygame.Rect(rect.topleft, (1, 1)) for rect in star_rects]
+    all_stars = set(range(len(star_rects)))
+
+    # Areas covered by the hexagon glow and the ball glow in the previous
+    # frame; the first frame is always drawn in full
+    previous_hex_rect = screen_rect
+    previous_ball_rect = screen_rect
+
+    accumulator = 0.0
+    previous_pos = tuple(ball_pos)
+    previous_angle = hexagon_angle
+
+    # Close the recording and export even if the loop fails, so what was
+    # captured up to that point stays readable
+    try:
+        running = True
+        while running:
+            # Real time since the last frame (in seconds)
+            frame_time = clock.tick(FPS) / 1000.0
+
+            # --- Event Handling ---
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif replay is not None and controls.handle(event):
+                    # Jump straight to the chosen frame without interpolating
+                    load_state(replay[controls.frame])
+                    previous_pos = tuple(ball_pos)
+                    previous_angle = hexagon_angle
+
+            # --- Fixed-Step Physics ---
+            # The accumulator holds real time not yet simulated. After a long
+            # hitch the backlog is dropped instead of running ever more steps.
+            accumulator += frame_time
+            steps = 0
+            while accumulator >= PHYSICS_DT and steps < MAX_CATCH_UP_STEPS:
+                previous_pos = tuple(ball_pos)
+                previous_angle = hexagon_angle
+                if replay is not None:
+                    load_state(replay[controls.advance()])
+                else:
+                    step_physics(PHYSICS_DT)
+                    if recorder is not None:
+                        recorder.record(*ball_pos, *ball_velocity, hexagon_angle)
+                accumulator -= PHYSICS_DT
+                steps += 1
+            if steps == MAX_CATCH_UP_STEPS:
+                accumulator = min(accumulator, PHYSICS_DT)
+
+            # Draw the ball and hexagon between the last two physics states
+            alpha = accumulator / PHYSICS_DT
+            draw_pos = (
+                previous_pos[0] + (ball_pos[0] - previous_pos[0]) * alpha,
+                previous_pos[1] + (ball_pos[1] - previous_pos[1]) * alpha,
+            )
+            hexagon.set_angle(previous_angle + (hexagon_angle - previous_angle) * alpha)
+            vertices = hexagon.vertices
+
+            # --- Dynamic Colors & Background Animations ---
+            elapsed_time = get_ticks() / 1000.0
+
+            # Compute dynamic colors using HSV (cycle hues over time)
+            hue_hex = (elapsed_time * 0.1) % 1.0
+            hexagon_color = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(hue_hex, 1, 1))
+            hue_ball = (elapsed_time * 0.2 + 0.5) % 1.0
+            ball_color = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(hue_ball, 1, 1))
+
+            # --- Offscreen Layers ---
+            # Convert hexagon vertices to integers for drawing
+            int_vertices = [(int(x), int(y)) for (x, y) in vertices]
+
+            # Glow effect for the hexagon on the reusable per-pixel alpha surface
+            glow_surface.fill((0, 0, 0, 0), previous_hex_rect)
+            # Outer glow (thick, translucent edge); its bounds cover the whole hexagon
+            glow_color = (hexagon_color[0], hexagon_color[1], hexagon_color[2], 50)
+            hex_rect = pygame.draw.polygon(glow_surface, glow_color, int_vertices, 15)
+            # Middle glow (medium thickness)
+            glow_color = (hexagon_color[0], hexagon_color[1], hexagon_color[2], 100)
+            pygame.draw.polygon(glow_surface, glow_color, int_vertices, 7)
+            # Sharp hexagon outline
+            pygame.draw.polygon(glow_surface, hexagon_color, int_vertices, 3)
+
+            # Add this frame's ball position to the trail
+            trails.push([(int(draw_pos[0]), int(draw_pos[1]))])
+            ball_rect = trails.bounds()
+
+            # --- Regions to Redraw ---
+            if args.dirty_rects:
+                # Where the hexagon and ball are now and where they were; these
+                # are rebuilt layer by layer below
+                dirty_rects = [hex_rect.union(previous_hex_rect)]
+                ball_region = ball_rect.union(previous_ball_rect)
+                if not dirty_rects[0].contains(ball_region):
+                    dirty_rects.append(ball_region)
+                # Every twinkling star not wholly inside those regions only has
+                # background under it, so it is cleared and redrawn on its own
+                inside = set()
+                for region in dirty_rects:
+                    shrunk = region.inflate(1 - star_size, 1 - star_size)
+                    shrunk.topleft = region.topleft
+                    inside.update(shrunk.collidelistall(star_corners))
+                outside = sorted(all_stars - inside)
+                star_dirty_rects = [star_rects[i] for i in outside]
+                previous_hex_rect = hex_rect
+                previous_ball_rect = ball_rect
+            else:
+                dirty_rects = [screen_rect]
+                star_dirty_rects = []
+                previous_hex_rect = previous_ball_rect = screen_rect
+
+            # --- Drawing ---
+            # Stars first, in one batch: those partly inside a region are then
+            # finished off by the region rebuild
+            if star_dirty_rects:
+                starfield.erase(screen, index=outside)
+                starfield.draw(screen, elapsed_time, index=outside)
+
+            # Each region is rebuilt from scratch, so overlapping regions are harmless
+            for region in dirty_rects:
+                screen.set_clip(region)
+
+                # Fill the background with black
+                screen.fill((0, 0, 0), region)
+
+                # Draw the twinkling star field
+                starfield.draw(screen, elapsed_time, index=region.collidelistall(star_rects))
+
+                screen.blit(glow_surface, (0, 0))
+
+                # Draw the fading trail onto the main screen
+                trails.draw(screen, ball_color)
+
+                # Draw the current ball (crisp circle) on top
+                pygame.draw.circle(
+                    screen, ball_color, (int(draw_pos[0]), int(draw_pos[1])), ball_radius
+                )
 
+            screen.set_clip(None)
+            if args.dirty_rects:
+                pygame.display.update(dirty_rects + star_dirty_rects)
+            else:
+                pygame.display.flip()
+            if exporter is not None:
+                exporter.write(screen)
+                running = not exporter.done
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if exporter is not None:
+            exporter.close()
     pygame.quit()
     sys.exit()
 
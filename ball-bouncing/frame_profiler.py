@@ -0,0 +1,130 @@
+import csv
+import json
+import time
+
+import numpy as np
+import pygame
+
+# Default phases, in the order a game loop runs them
+PHASES = ('events', 'physics', 'collision', 'render')
+
+
+def _ignore(*args):
+    pass
+
+
+class FrameProfiler:
+    """
+    Per-phase wall-clock timings for a game loop.
+
+    Call begin_frame() at the top of the loop, mark(phase) as each phase
+    finishes and end_frame() once the frame is presented. mark() charges
+    the time since the previous mark to the phase, adding to what it
+    already has, so a phase may be marked several times a frame (once per
+    fixed physics step, say). Time after the last mark, such as waiting in
+    clock.tick, belongs to no phase.
+
+    The overlay shows the rolling median and 99th percentile of each phase
+    over the last "window" frames; it is redrawn every "refresh" frames and
+    its own drawing time is left out of the phases. With output set, every
+    frame's timings are kept and written out by close(), as CSV or, for a
+    .json path, JSON with a summary.
+
+    A profiler with neither overlay nor output replaces its methods with an
+    empty function, so leaving the hooks in a loop costs one call each.
+    """
+
+    def __init__(self, overlay=False, output=None, phases=PHASES, window=240, refresh=30):
+        self.overlay = overlay
+        self.output = output
+        if not overlay and output is None:
+            self.begin_frame = self.mark = self.end_frame = self.draw = self.close = _ignore
+            return
+
+        self.phases = list(phases)
+        self.index = {phase: i for i, phase in enumerate(self.phases)}
+        self.current = [0] * len(self.phases)
+        # Milliseconds per phase over the last "window" frames, total last
+        self.window = np.zeros((window, len(self.phases) + 1))
+        self.frames = 0
+        self.rows = [] if output is not None else None
+        self.refresh = refresh
+        self.font = None
+        self.panel = None
+        self.last = time.perf_counter_ns()
+
+    def begin_frame(self):
+        self.current = [0] * len(self.phases)
+        self.last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        times = [ns / 1e6 for ns in self.current]
+        times.append(sum(times))
+        self.window[self.frames % len(self.window)] = times
+        self.frames += 1
+        if self.rows is not None:
+            self.rows.append(times)
+
+    def stats(self):
+        """Return {phase: (p50, p99)} in milliseconds over the rolling window."""
+        filled = self.window[:min(self.frames, len(self.window))]
+        if not len(filled):
+            filled = np.zeros((1, self.window.shape[1]))
+        p50, p99 = np.percentile(filled, [50, 99], axis=0)
+        return dict(zip(self.phases + ['frame'], zip(p50.tolist(), p99.tolist())))
+
+    def draw(self, surface):
+        """Blit the timing panel in the top-right corner of surface."""
+        if not self.overlay:
+            return
+        start = time.perf_counter_ns()
+        if self.panel is None or self.frames % self.refresh == 0:
+            if self.font is None:
+                self.font = pygame.font.Font(None, 20)
+            rows = [('ms', 'p50', 'p99')]
+            rows += [(phase, f"{p50:.2f}", f"{p99:.2f}")
+                     for phase, (p50, p99) in self.stats().items()]
+            cells = [[self.font.render(text, True, (255, 255, 255)) for text in row]
+                     for row in rows]
+            # The default font is proportional: left-align the phase names and
+            # right-align the numbers in columns as wide as their widest cell
+            widths = [max(row[i].get_width() for row in cells) + 12 for i in range(3)]
+            line_height = self.font.get_linesize()
+            self.panel = pygame.Surface((sum(widths) - 4, line_height * len(rows) + 8),
+                                        pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 160))
+            for r, row in enumerate(cells):
+                y = 4 + r * line_height
+                self.panel.blit(row[0], (4, y))
+                self.panel.blit(row[1], (widths[0] + widths[1] - row[1].get_width() - 8, y))
+                self.panel.blit(row[2], (sum(widths) - row[2].get_width() - 8, y))
+        surface.blit(self.panel, (surface.get_width() - self.panel.get_width() - 10, 10))
+        # Leave the overlay out of whichever phase is marked next
+        self.last += time.perf_counter_ns() - start
+
+    def close(self):
+        """Write the per-frame timings to output, if one was given."""
+        if self.output is None:
+            return
+        columns = [f"{phase}_ms" for phase in self.phases] + ['frame_ms']
+        if self.output.endswith('.json'):
+            times = np.array(self.rows, dtype=float).reshape(-1, len(columns))
+            summary = {}
+            if len(times):
+                p50, p99 = np.percentile(times, [50, 99], axis=0)
+                for i, column in enumerate(columns):
+                    summary[column] = {'mean': float(times[:, i].mean()), 'p50': float(p50[i]),
+                                       'p99': float(p99[i]), 'max': float(times[:, i].max())}
+            with open(self.output, 'w') as f:
+                json.dump({'frames': len(self.rows), 'columns': columns,
+                           'summary': summary, 'times': self.rows}, f)
+        else:
+            with open(self.output, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame'] + columns)
+                writer.writerows([i, *row] for i, row in enumerate(self.rows))
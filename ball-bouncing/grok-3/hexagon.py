@@ -1,15 +1,19 @@
 import pygame
+import argparse
 import math
+import os
 import random
+import sys
 
-# Initialize Pygame
-pygame.init()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_profiler import FrameProfiler
+from recorder import Recorder, Replay, ReplayControls
+from rotating_polygon import RotatingPolygon
+from video_export import ExportClock, VideoExporter, use_dummy_display
 
-# Set up the display
+# Display size
 WIDTH = 800
 HEIGHT = 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Bouncing Ball in Spinning Hexagon")
 
 # Colors
 WHITE = (255, 255, 255)
@@ -21,6 +25,7 @@ HEX_RADIUS = 300
 center = (WIDTH // 2, HEIGHT // 2)
 rotation_angle = 0
 rotation_speed = 0.5  # degrees per frame
+hexagon = RotatingPolygon(center, HEX_RADIUS)
 
 # Ball properties
 BALL_RADIUS = 20
@@ -30,8 +35,8 @@ GRAVITY = 0.2
 FRICTION = 0.99  # Velocity reduction per frame
 BOUNCE = 0.8  # Velocity reduction on bounce
 
-# Clock for controlling frame rate
-clock = pygame.time.Clock()
+# Phase timings; disabled unless main() is asked to profile
+profiler = FrameProfiler()
 
 
 def rotate_point(point, angle, center_point):
@@ -43,116 +48,166 @@ def rotate_point(point, angle, center_point):
     return [new_x + center_point[0], new_y + center_point[1]]
 
 
-def get_hexagon_vertices(center, radius, angle):
-    """Calculate vertices of a rotating hexagon"""
-    vertices = []
-    for i in range(6):
-        vertex_angle = math.radians(60 * i + angle)
-        x = center[0] + radius * math.cos(vertex_angle)
-        y = center[1] + radius * math.sin(vertex_angle)
-        vertices.append([x, y])
-    return vertices
-
-
-def line_intersection(p1, p2, p3, p4):
-    """Find intersection point between two lines, return None if no intersection"""
-    x1, y1 = p1
-    x2, y2 = p2
-    x3, y3 = p3
-    x4, y4 = p4
-
-    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-    if denom == 0:
-        return None
-
-    px = ((x1 * y2 - y1 * x2) * (x3 - x4) - (x1 - x2) * (x3 * y4 - y3 * x4)) / denom
-    py = ((x1 * y2 - y1 * x2) * (y3 - y4) - (y1 - y2) * (x3 * y4 - y3 * x4)) / denom
-
-    # Check if intersection is within line segments
-    if (
-        min(x1, x2) <= px <= max(x1, x2)
-        and min(y1, y2) <= py <= max(y1, y2)
-        and min(x3, x4) <= px <= max(x3, x4)
-        and min(y3, y4) <= py <= max(y3, y4)
-    ):
-        return (px, py)
-    return None
-
-
-def reflect_velocity(pos, vel, wall_start, wall_end):
-    """Calculate new velocity after hitting a wall"""
-    # Wall vector
-    wx = wall_end[0] - wall_start[0]
-    wy = wall_end[1] - wall_start[1]
-
-    # Normal vector
-    nx = -wy
-    ny = wx
-    n_length = math.sqrt(nx * nx + ny * ny)
-    nx /= n_length
-    ny /= n_length
-
-    # Dot product of velocity and normal
-    dot = vel[0] * nx + vel[1] * ny
-
-    # Reflect velocity
-    new_vel_x = vel[0] - 2 * dot * nx
-    new_vel_y = vel[1] - 2 * dot * ny
-
-    return [new_vel_x * BOUNCE, new_vel_y * BOUNCE]
-
-
-# Main game loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # Update rotation
-    rotation_angle += rotation_speed
+def reset(seed=None):
+    """Put the ball back at the start with a random sideways velocity drawn from seed"""
+    global rotation_angle, ball_pos, ball_vel
+    rng = random.Random(seed)
+    rotation_angle = 0
+    hexagon.set_angle(0)
+    ball_pos = [WIDTH // 2, HEIGHT // 2 - 200]
+    ball_vel = [rng.uniform(-5, 5), 0]
 
-    # Apply gravity and friction
-    ball_vel[1] += GRAVITY
-    ball_vel[0] *= FRICTION
-    ball_vel[1] *= FRICTION
 
-    # Calculate new position
-    new_pos = [ball_pos[0] + ball_vel[0], ball_pos[1] + ball_vel[1]]
+def load_state(state):
+    """Set the ball and hexagon from a recorded row"""
+    global rotation_angle, ball_pos, ball_vel
+    ball_pos = [float(state["x"]), float(state["y"])]
+    ball_vel = [float(state["vel_x"]), float(state["vel_y"])]
+    rotation_angle = float(state["angle"])
+    hexagon.set_angle(math.radians(rotation_angle))
 
-    # Get hexagon vertices
-    vertices = get_hexagon_vertices(center, HEX_RADIUS, rotation_angle)
 
-    # Check collision with each wall
-    for i in range(6):
-        wall_start = vertices[i]
-        wall_end = vertices[(i + 1) % 6]
+def step_physics():
+    """Advance the ball and hexagon by one frame, returning the number of wall hits"""
+    global rotation_angle, ball_pos, ball_vel
 
-        intersection = line_intersection(ball_pos, new_pos, wall_start, wall_end)
+    # Apply gravity and friction
+    ball_vel[1] += GRAVITY
+    ball_vel[0] *= FRICTION
+    ball_vel[1] *= FRICTION
+    profiler.mark("physics")
 
-        if intersection:
-            # Move ball to intersection point
-            ball_pos = list(intersection)
-            # Reflect velocity
-            ball_vel = reflect_velocity(ball_pos, ball_vel, wall_start, wall_end)
-            break
+    # Sweep the ball through the frame while the hexagon turns, bouncing off
+    # the walls at the exact moment it touches them, so it cannot tunnel out
+    hexagon.set_angle(math.radians(rotation_angle))
+    rotation_angle += rotation_speed
+    ball_pos, ball_vel, hits = hexagon.sweep_circle(
+        ball_pos, ball_vel, BALL_RADIUS, math.radians(rotation_speed), 1, BOUNCE
+    )
+    profiler.mark("collision")
+    return hits
+
+
+def main():
+    global profiler
+    parser = argparse.ArgumentParser(description="Bouncing ball in a spinning hexagon")
+    parser.add_argument("--seed", type=int, help="Seed for the ball's launch velocity")
+    parser.add_argument("--record", metavar="PATH", help="Record every frame's state to PATH")
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Play back a recording: space pauses, arrows scrub, home/end jump",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="PATH",
+        help="Render offscreen as fast as possible and write a video to PATH",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=60,
+        help="Length of the exported video in seconds (default: 60)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Show per-phase frame timings (p50/p99) on screen"
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="PATH",
+        help="Write per-frame phase timings to PATH (.csv or .json)",
+    )
+    args = parser.parse_args()
+
+    reset(args.seed)
+    profiler = FrameProfiler(args.profile, args.profile_output)
+    recorder = None
+    if args.record:
+        recorder = Recorder(
+            args.record,
+            {
+                "script": "grok-3/hexagon.py",
+                "seed": args.seed,
+                "angle_units": "degrees",
+                "gravity": GRAVITY,
+                "friction": FRICTION,
+                "bounce": BOUNCE,
+                "rotation_speed": rotation_speed,
+            },
+        )
+    replay = None
+    if args.replay:
+        replay = Replay(args.replay)
+        controls = ReplayControls(len(replay))
+        load_state(replay[0])
+
+    # Initialize Pygame
+    if args.export:
+        use_dummy_display()
+    pygame.init()
+
+    # Set up the display
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Bouncing Ball in Spinning Hexagon")
+
+    # Clock for controlling frame rate; an export renders frames back to back
+    exporter = None
+    if args.export:
+        clock = ExportClock(60)
+        exporter = VideoExporter(args.export, (WIDTH, HEIGHT), 60, args.duration)
     else:
-        # No collision, update position normally
-        ball_pos = new_pos
-
-    # Clear screen
-    screen.fill(BLACK)
-
-    # Draw hexagon
-    pygame.draw.polygon(screen, WHITE, vertices, 2)
-
-    # Draw ball
-    pygame.draw.circle(screen, RED, [int(ball_pos[0]), int(ball_pos[1])], BALL_RADIUS)
-
-    # Update display
-    pygame.display.flip()
-
-    # Control frame rate
-    clock.tick(60)
-
-pygame.quit()
+        clock = pygame.time.Clock()
+
+    # Main game loop; close the recording and export even if it fails so
+    # what was captured up to that point stays readable
+    try:
+        running = True
+        while running:
+            profiler.begin_frame()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif replay is not None and controls.handle(event):
+                    load_state(replay[controls.frame])
+            profiler.mark("events")
+
+            if replay is not None:
+                load_state(replay[controls.advance()])
+                profiler.mark("physics")
+            else:
+                step_physics()
+                if recorder is not None:
+                    recorder.record(*ball_pos, *ball_vel, rotation_angle)
+            vertices = hexagon.vertices
+
+            # Clear screen
+            screen.fill(BLACK)
+
+            # Draw hexagon
+            pygame.draw.polygon(screen, WHITE, vertices, 2)
+
+            # Draw ball
+            pygame.draw.circle(screen, RED, [int(ball_pos[0]), int(ball_pos[1])], BALL_RADIUS)
+            profiler.draw(screen)
+
+            # Update display
+            pygame.display.flip()
+            profiler.mark("render")
+            profiler.end_frame()
+            if exporter is not None:
+                exporter.write(screen)
+                running = not exporter.done
+
+            # Control frame rate
+            clock.tick(60)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if exporter is not None:
+            exporter.close()
+        profiler.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
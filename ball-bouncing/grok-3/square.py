@@ -1,24 +1,25 @@
 import pygame
+import argparse
 import math
+import os
+import sys
 
-# Initialize Pygame
-pygame.init()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_profiler import FrameProfiler
+from video_export import ExportClock, VideoExporter, use_dummy_display
 
 # Constants
 WIDTH, HEIGHT = 800, 800  # Window size
 FPS = 60  # Frames per second
 DT = 0.01  # Time step for simulation
+SIMULATION_SPEED = DT * FPS  # Simulated time per second of real time
+MAX_CATCH_UP_STEPS = 5  # Physics steps allowed per rendered frame
 GRAVITY = 0.1  # Gravity acceleration
 OMEGA = 1.0  # Angular velocity of the square (rad/s)
 E = 0.8  # Coefficient of restitution (elasticity)
 F = 0.9  # Friction factor (reduces tangential velocity)
 SCALE = 300  # Scale from simulation units to pixels
 
-# Set up the display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Ball Bouncing in Spinning Square")
-clock = pygame.time.Clock()
-
 # Ball properties
 x, y = 0, 0  # Initial position at center
 v_x, v_y = 1, 0  # Initial velocity
@@ -26,6 +27,9 @@ v_x, v_y = 1, 0  # Initial velocity
 # Simulation time
 t = 0
 
+# Phase timings; disabled unless main() is asked to profile
+profiler = FrameProfiler()
+
 
 # Function to handle collision with the square's walls
 def handle_collision(n_rot, theta):
@@ -67,13 +71,9 @@ def handle_collision(n_rot, theta):
     v_x, v_y = v_lab_after_x, v_lab_after_y
 
 
-# Main game loop
-running = True
-while running:
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+# Advance the simulation by one fixed time step of DT
+def step_physics():
+    global x, y, v_y, t
 
     # Update ball velocity due to gravity
     v_y -= GRAVITY * DT
@@ -81,6 +81,7 @@ while running:
     # Update ball position
     x += v_x * DT
     y += v_y * DT
+    profiler.mark("physics")
 
     # Compute rotation angle of the square
     theta = OMEGA * t
@@ -100,38 +101,133 @@ while running:
         handle_collision((0, -1), theta)  # Top side
     elif y_rot < -1 and abs(x_rot) <= 1:
         handle_collision((0, 1), theta)  # Bottom side
+    profiler.mark("collision")
 
-    # Clear the screen
-    screen.fill((0, 0, 0))  # Black background
-
-    # Draw the spinning square
-    vertices = [
-        (1, 1),
-        (1, -1),
-        (-1, -1),
-        (-1, 1),
-    ]  # Square corners in simulation units
-    rotated_vertices = [
-        (vx * cos_theta - vy * sin_theta, vx * sin_theta + vy * cos_theta)
-        for vx, vy in vertices
-    ]
-    screen_vertices = [
-        (WIDTH // 2 + vx * SCALE, HEIGHT // 2 - vy * SCALE)
-        for vx, vy in rotated_vertices
-    ]
-    pygame.draw.lines(screen, (255, 255, 255), True, screen_vertices, 2)
-
-    # Draw the ball
-    screen_x = WIDTH // 2 + x * SCALE
-    screen_y = HEIGHT // 2 - y * SCALE
-    pygame.draw.circle(screen, (255, 0, 0), (int(screen_x), int(screen_y)), 10)
-
-    # Update the display
-    pygame.display.flip()
-
-    # Increment time and control frame rate
     t += DT
-    clock.tick(FPS)
 
-# Quit Pygame
-pygame.quit()
+
+def main():
+    global profiler
+    parser = argparse.ArgumentParser(description="Ball bouncing in a spinning square")
+    parser.add_argument(
+        "--export",
+        metavar="PATH",
+        help="Render offscreen as fast as possible and write a video to PATH",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=60,
+        help="Length of the exported video in seconds (default: 60)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Show per-phase frame timings (p50/p99) on screen"
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="PATH",
+        help="Write per-frame phase timings to PATH (.csv or .json)",
+    )
+    args = parser.parse_args()
+    profiler = FrameProfiler(args.profile, args.profile_output)
+
+    # Initialize Pygame
+    if args.export:
+        use_dummy_display()
+    pygame.init()
+
+    # Set up the display
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Ball Bouncing in Spinning Square")
+
+    # An export renders frames back to back, each one exactly 1 / FPS apart
+    exporter = None
+    if args.export:
+        clock = ExportClock(FPS)
+        exporter = VideoExporter(args.export, (WIDTH, HEIGHT), FPS, args.duration)
+    else:
+        clock = pygame.time.Clock()
+
+    # Physics runs in fixed DT steps whatever the frame rate; the accumulator
+    # holds simulated time not yet stepped, and each frame is drawn between
+    # the last two physics states
+    accumulator = 0.0
+    previous = (x, y, t)
+
+    # Main game loop
+    running = True
+    while running:
+        profiler.begin_frame()
+
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        profiler.mark("events")
+
+        # Step the physics to catch up with real time. After a long hitch the
+        # backlog is dropped instead of running ever more steps per frame.
+        accumulator += clock.tick(FPS) / 1000 * SIMULATION_SPEED
+        steps = 0
+        while accumulator >= DT and steps < MAX_CATCH_UP_STEPS:
+            previous = (x, y, t)
+            step_physics()
+            accumulator -= DT
+            steps += 1
+        if steps == MAX_CATCH_UP_STEPS:
+            accumulator = min(accumulator, DT)
+
+        # Interpolate the drawn state between the last two physics steps
+        alpha = accumulator / DT
+        draw_x, draw_y, draw_t = (
+            before + (after - before) * alpha
+            for before, after in zip(previous, (x, y, t))
+        )
+        theta = OMEGA * draw_t
+        cos_theta = math.cos(theta)
+        sin_theta = math.sin(theta)
+
+        # Clear the screen
+        screen.fill((0, 0, 0))  # Black background
+
+        # Draw the spinning square
+        vertices = [
+            (1, 1),
+            (1, -1),
+            (-1, -1),
+            (-1, 1),
+        ]  # Square corners in simulation units
+        rotated_vertices = [
+            (vx * cos_theta - vy * sin_theta, vx * sin_theta + vy * cos_theta)
+            for vx, vy in vertices
+        ]
+        screen_vertices = [
+            (WIDTH // 2 + vx * SCALE, HEIGHT // 2 - vy * SCALE)
+            for vx, vy in rotated_vertices
+        ]
+        pygame.draw.lines(screen, (255, 255, 255), True, screen_vertices, 2)
+
+        # Draw the ball
+        screen_x = WIDTH // 2 + draw_x * SCALE
+        screen_y = HEIGHT // 2 - draw_y * SCALE
+        pygame.draw.circle(screen, (255, 0, 0), (int(screen_x), int(screen_y)), 10)
+        profiler.draw(screen)
+
+        # Update the display
+        pygame.display.flip()
+        profiler.mark("render")
+        profiler.end_frame()
+        if exporter is not None:
+            exporter.write(screen)
+            running = not exporter.done
+
+    if exporter is not None:
+        exporter.close()
+    profiler.close()
+
+    # Quit Pygame
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import csv
+import math
+import time
+
+import numpy as np
+
+from square import DT, E, F, GRAVITY, OMEGA
+
+# A ball this far from the centre is outside every corner of the square
+ESCAPE_RADIUS = math.sqrt(2)
+
+
+class Ensemble:
+    # N independent runs of square.step_physics advanced together. Every
+    # member has its own OMEGA, E and F; ball state lives in NumPy arrays and
+    # the rotating-frame transform, wall test and collision response are
+    # array operations, computed in the same order as the scalar version.
+    def __init__(self, omega, e, f, x=0.0, y=0.0, v_x=1.0, v_y=0.0):
+        self.omega, self.e, self.f = (
+            np.array(values, dtype=float) for values in np.broadcast_arrays(omega, e, f)
+        )
+        size = len(self.omega)
+        self.x = np.full(size, x, dtype=float)
+        self.y = np.full(size, y, dtype=float)
+        self.v_x = np.full(size, v_x, dtype=float)
+        self.v_y = np.full(size, v_y, dtype=float)
+        self.t = 0.0
+
+        # Per-member statistics; bounces stop counting once a ball escapes
+        self.bounces = np.zeros(size, dtype=int)
+        self.escape_time = np.full(size, np.nan)
+
+    def __len__(self):
+        return len(self.omega)
+
+    def handle_collisions(self, hit, n_x, n_y, cos_theta, sin_theta):
+        # square.handle_collision for the members in "hit"
+        omega = self.omega[hit]
+        x = self.x[hit]
+        y = self.y[hit]
+
+        # Compute velocity in the rotating frame
+        omega_cross_r_x = -omega * y
+        omega_cross_r_y = omega * x
+        relative_x = self.v_x[hit] + omega * y
+        relative_y = self.v_y[hit] - omega * x
+        v_rot_x = relative_x * cos_theta + relative_y * sin_theta
+        v_rot_y = -relative_x * sin_theta + relative_y * cos_theta
+
+        # Decompose velocity into normal and tangential components
+        v_normal_mag = v_rot_x * n_x + v_rot_y * n_y
+        v_normal_x = v_normal_mag * n_x
+        v_normal_y = v_normal_mag * n_y
+        v_tangential_x = v_rot_x - v_normal_x
+        v_tangential_y = v_rot_y - v_normal_y
+
+        # Apply collision response with elasticity and friction
+        e = self.e[hit]
+        f = self.f[hit]
+        v_rot_after_x = -e * v_normal_x + f * v_tangential_x
+        v_rot_after_y = -e * v_normal_y + f * v_tangential_y
+
+        # Transform velocity back to lab frame
+        self.v_x[hit] = (cos_theta * v_rot_after_x - sin_theta * v_rot_after_y) + omega_cross_r_x
+        self.v_y[hit] = (sin_theta * v_rot_after_x + cos_theta * v_rot_after_y) + omega_cross_r_y
+
+    def step(self):
+        # Update ball velocity due to gravity
+        self.v_y -= GRAVITY * DT
+
+        # Update ball position
+        self.x += self.v_x * DT
+        self.y += self.v_y * DT
+
+        # Ball positions in each member's rotating frame
+        theta = self.omega * self.t
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        x_rot = self.x * cos_theta + self.y * sin_theta
+        y_rot = -self.x * sin_theta + self.y * cos_theta
+
+        # Wall tests in the same priority as the scalar if/elif chain
+        within_y = np.abs(y_rot) <= 1
+        within_x = np.abs(x_rot) <= 1
+        right = (x_rot > 1) & within_y
+        left = (x_rot < -1) & within_y & ~right
+        side = right | left
+        top = (y_rot > 1) & within_x & ~side
+        bottom = (y_rot < -1) & within_x & ~side & ~top
+
+        hit = np.flatnonzero(side | top | bottom)
+        if len(hit):
+            n_x = np.where(right[hit], -1.0, np.where(left[hit], 1.0, 0.0))
+            n_y = np.where(top[hit], -1.0, np.where(bottom[hit], 1.0, 0.0))
+            self.handle_collisions(hit, n_x, n_y, cos_theta[hit], sin_theta[hit])
+            self.bounces[hit] += np.isnan(self.escape_time[hit])
+
+        self.t += DT
+
+        # Record the first time each ball leaves the square for good
+        escaped = (np.hypot(self.x, self.y) > ESCAPE_RADIUS) & np.isnan(self.escape_time)
+        self.escape_time[escaped] = self.t
+
+    def energy(self):
+        # Kinetic plus potential energy per unit mass
+        return 0.5 * (self.v_x ** 2 + self.v_y ** 2) + GRAVITY * self.y
+
+
+def sample_parameters(members, omega, e, f, seed=None):
+    # Uniform samples from each [low, high] range
+    rng = np.random.default_rng(seed)
+    return tuple(rng.uniform(low, high, members) for low, high in (omega, e, f))
+
+
+def write_results(path, ensemble):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['omega', 'e', 'f', 'escape_time', 'bounces', 'energy'])
+        writer.writerows(zip(ensemble.omega.tolist(), ensemble.e.tolist(), ensemble.f.tolist(),
+                             ensemble.escape_time.tolist(), ensemble.bounces.tolist(),
+                             ensemble.energy().tolist()))
+
+
+def print_summary(ensemble, seconds, steps):
+    escaped = ~np.isnan(ensemble.escape_time)
+    print(f"members:          {len(ensemble)}")
+    print(f"steps:            {steps} (t = {ensemble.t:.2f})")
+    print(f"ball-steps/s:     {len(ensemble) * steps / seconds:,.0f}")
+    print(f"escaped:          {escaped.mean():.1%}")
+    if escaped.any():
+        print(f"escape time:      median {np.median(ensemble.escape_time[escaped]):.2f}, "
+              f"min {ensemble.escape_time[escaped].min():.2f}")
+    print(f"bounces:          mean {ensemble.bounces.mean():.1f}, max {ensemble.bounces.max()}")
+    contained = ensemble.energy()[~escaped]
+    if len(contained):
+        print(f"energy (inside):  mean {contained.mean():.4f}, "
+              f"std {contained.std():.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many spinning-square simulations at once')
+    parser.add_argument('--members', type=int, default=100000,
+                        help='Number of independent simulations (default: 100000)')
+    parser.add_argument('--steps', type=int, default=10000,
+                        help='Time steps of DT to simulate (default: 10000)')
+    parser.add_argument('--omega', type=float, nargs=2, default=[OMEGA, OMEGA],
+                        metavar=('LOW', 'HIGH'), help='Range of square angular velocities')
+    parser.add_argument('--e', type=float, nargs=2, default=[E, E], metavar=('LOW', 'HIGH'),
+                        help='Range of coefficients of restitution')
+    parser.add_argument('--f', type=float, nargs=2, default=[F, F], metavar=('LOW', 'HIGH'),
+                        help='Range of friction factors')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the parameter samples')
+    parser.add_argument('--output', help='Write per-member results to this CSV file')
+    args = parser.parse_args()
+
+    ensemble = Ensemble(*sample_parameters(args.members, args.omega, args.e, args.f, args.seed))
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        ensemble.step()
+    seconds = time.perf_counter() - start
+
+    print_summary(ensemble, seconds, args.steps)
+    if args.output:
+        write_results(args.output, ensemble)
+
+
+if __name__ == "__main__":
+    main()
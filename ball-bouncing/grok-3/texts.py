@@ -1,8 +1,26 @@
 import pygame
+import argparse
 import sys
 import math
+import os
 import random
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_profiler import FrameProfiler
+from rotating_polygon import RotatingPolygon
+
+parser = argparse.ArgumentParser(description="Bouncing texts in a spinning hexagon")
+parser.add_argument(
+    "--profile", action="store_true", help="Show per-phase frame timings (p50/p99) on screen"
+)
+parser.add_argument(
+    "--profile-output",
+    metavar="PATH",
+    help="Write per-frame phase timings to PATH (.csv or .json)",
+)
+args = parser.parse_args()
+profiler = FrameProfiler(args.profile, args.profile_output)
+
 # Initialize Pygame
 pygame.init()
 
@@ -25,6 +43,7 @@ COLORS = [
 CENTER = (WIDTH // 2, HEIGHT // 2)
 RADIUS = 200  # Distance from center to vertex
 ANGLE_STEP = 0.01  # Angular velocity in radians per frame
+hexagon = RotatingPolygon(CENTER, RADIUS)
 
 # Text setup
 WORDS = ["STOP", "MAKING", "FUCKING", "BALLS"]
@@ -61,21 +80,21 @@ clock = pygame.time.Clock()
 angle = 0  # Hexagon rotation angle
 
 while True:
+    profiler.begin_frame()
+
     # Handle events
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            profiler.close()
             pygame.quit()
             sys.exit()
+    profiler.mark("events")
 
     # Update hexagon rotation
     angle += ANGLE_STEP
     # Calculate current vertices of the hexagon
-    current_vertices = []
-    for i in range(6):
-        theta = 2 * math.pi * i / 6 + angle
-        x = CENTER[0] + RADIUS * math.cos(theta)
-        y = CENTER[1] + RADIUS * math.sin(theta)
-        current_vertices.append((x, y))
+    hexagon.set_angle(angle)
+    current_vertices = hexagon.vertices
 
     # Update each text object
     for text in texts:
@@ -89,22 +108,19 @@ while True:
         # Update position based on velocity
         text["pos"][0] += text["velocity"][0]
         text["pos"][1] += text["velocity"][1]
+    profiler.mark("physics")
 
-        # Collision detection with hexagon edges
-        for i in range(6):
-            p1 = current_vertices[i]
-            p2 = current_vertices[(i + 1) % 6]
+    # Collision detection with hexagon edges; each text only moves itself,
+    # so checking them after all have moved gives the same result
+    for text in texts:
+        for p1, line_vec, inv_line_len_sq, normal in hexagon.edges():
             # Find the closest point on the edge to the text's center
-            line_vec = (p2[0] - p1[0], p2[1] - p1[1])
             to_text = (text["pos"][0] - p1[0], text["pos"][1] - p1[1])
-            line_len_sq = line_vec[0] ** 2 + line_vec[1] ** 2
-            if line_len_sq == 0:
-                continue
             proj = max(
                 0,
                 min(
                     1,
-                    (to_text[0] * line_vec[0] + to_text[1] * line_vec[1]) / line_len_sq,
+                    (to_text[0] * line_vec[0] + to_text[1] * line_vec[1]) * inv_line_len_sq,
                 ),
             )
             closest = (p1[0] + proj * line_vec[0], p1[1] + proj * line_vec[1])
@@ -114,17 +130,7 @@ while True:
             # Check if the text's circle intersects the edge
             if dist < text["radius"]:
                 # Collision detected
-                # Calculate outward normal (perpendicular to edge)
-                edge_vec = (p2[0] - p1[0], p2[1] - p1[1])
-                normal = (-edge_vec[1], edge_vec[0])  # Rotate 90 degrees
-                norm_len = math.hypot(normal[0], normal[1])
-                if norm_len > 0:
-                    normal = (normal[0] / norm_len, normal[1] / norm_len)
-                # Ensure normal points outward
-                to_center = (p1[0] - CENTER[0], p1[1] - CENTER[1])
-                if normal[0] * to_center[0] + normal[1] * to_center[1] < 0:
-                    normal = (-normal[0], -normal[1])
-
+                # The polygon's normal is already the outward unit normal
                 # Reflect velocity over the normal
                 v_dot_n = (
                     text["velocity"][0] * normal[0] + text["velocity"][1] * normal[1]
@@ -137,6 +143,7 @@ while True:
                 text["pos"][0] += normal[0] * overlap
                 text["pos"][1] += normal[1] * overlap
                 break  # Handle one collision per frame for simplicity
+    profiler.mark("collision")
 
     # Render everything
     screen.fill(BLACK)  # Clear screen with black background
@@ -149,5 +156,9 @@ while True:
         text["rect"].center = (int(text["pos"][0]), int(text["pos"][1]))
         screen.blit(text["surface"], text["rect"])
 
+    profiler.draw(screen)
+
     pygame.display.flip()  # Update display
+    profiler.mark("render")
+    profiler.end_frame()
     clock.tick(60)  # Limit to 60 FPS
@@ -0,0 +1,141 @@
+import json
+import os
+import time
+
+import numpy as np
+import pygame
+
+# One row per physics step; float32 keeps a row at 20 bytes
+STATE_DTYPE = np.dtype([
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('vel_x', '<f4'),
+    ('vel_y', '<f4'),
+    ('angle', '<f4'),
+])
+
+
+def sidecar_path(path):
+    return path + '.json'
+
+
+class Recorder:
+    """
+    Appends per-step ball and hexagon state to a flat binary file.
+
+    Recording a step only appends a tuple to a list; once a chunk's worth
+    has gathered it is converted into a preallocated structured array in
+    one NumPy call and written out, which is several times cheaper than
+    assigning NumPy rows one by one. Chunks are also flushed every
+    "flush_interval" seconds, so a run that dies loses at most that much.
+
+    The JSON sidecar next to the file holds the dtype and any metadata
+    needed to reproduce the run (seed, constants). It is written before the
+    first row and the row count comes from the file size, so a recording
+    cut short by a crash still replays up to its last flush.
+    """
+
+    def __init__(self, path, metadata=None, chunk_size=4096, flush_interval=1.0):
+        self.path = path
+        self.metadata = metadata or {}
+        self.buffer = np.empty(chunk_size, dtype=STATE_DTYPE)
+        self.pending = []
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.frames = 0
+        with open(sidecar_path(path), 'w') as f:
+            json.dump({'dtype': STATE_DTYPE.descr, 'metadata': self.metadata}, f, indent=2)
+        self.file = open(path, 'wb')
+
+    def record(self, x, y, vel_x, vel_y, angle):
+        pending = self.pending
+        pending.append((x, y, vel_x, vel_y, angle))
+        if len(pending) == self.chunk_size:
+            self.flush()
+        elif time.monotonic() - self.last_flush > self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        count = len(self.pending)
+        if count:
+            self.buffer[:count] = self.pending
+            self.file.write(self.buffer[:count].tobytes())
+            self.frames += count
+            self.pending.clear()
+            self.file.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Replay:
+    """
+    A recording opened as a read-only memory map: any frame is one index
+    into the file, with no re-simulation and no loading of the whole run.
+    """
+
+    def __init__(self, path):
+        with open(sidecar_path(path)) as f:
+            info = json.load(f)
+        self.metadata = info['metadata']
+        dtype = np.dtype([tuple(field) for field in info['dtype']])
+        # A crash can leave a partly written last row; leave it out
+        frames = os.path.getsize(path) // dtype.itemsize
+        self.states = np.memmap(path, dtype=dtype, mode='r', shape=(frames,))
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, frame):
+        return self.states[frame]
+
+
+class ReplayControls:
+    """
+    Keyboard scrubbing for a replay: space pauses, left/right step one
+    frame, up/down jump "jump" frames and home/end go to either end.
+    """
+
+    def __init__(self, length, jump=60):
+        self.length = length
+        self.jump = jump
+        self.frame = 0
+        self.paused = False
+
+    def handle(self, event):
+        """Apply a KEYDOWN event; returns True if it moved the playhead."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_SPACE:
+            self.paused = not self.paused
+            return False
+
+        moves = {
+            pygame.K_LEFT: self.frame - 1,
+            pygame.K_RIGHT: self.frame + 1,
+            pygame.K_DOWN: self.frame - self.jump,
+            pygame.K_UP: self.frame + self.jump,
+            pygame.K_HOME: 0,
+            pygame.K_END: self.length - 1,
+        }
+        if event.key not in moves:
+            return False
+        self.frame = max(0, min(self.length - 1, moves[event.key]))
+        return True
+
+    def advance(self):
+        """Move to the next frame unless paused or at the end; returns the frame."""
+        if not self.paused and self.frame < self.length - 1:
+            self.frame += 1
+        return self.frame
@@ -0,0 +1,213 @@
+import math
+
+
+class RotatingPolygon:
+    """
+    A regular convex polygon spinning about its centre.
+
+    Vertices, edge vectors and outward normals are stored once for the
+    unrotated unit polygon; set_angle applies a single rotation to all of
+    them. Edge lengths do not change under rotation, so the inverse squared
+    lengths used for closest-point projection are computed only once.
+    """
+
+    def __init__(self, center, radius, sides=6, angle=0.0):
+        self.center = center
+        self.radius = radius
+        self.sides = sides
+        step = 2 * math.pi / sides
+
+        self.unit_vertices = [(math.cos(i * step), math.sin(i * step)) for i in range(sides)]
+        self.unit_edges = [
+            (bx - ax, by - ay)
+            for (ax, ay), (bx, by) in zip(
+                self.unit_vertices, self.unit_vertices[1:] + self.unit_vertices[:1]
+            )
+        ]
+        # The outward normal of edge i points at the edge midpoint
+        self.unit_normals = [
+            (math.cos((i + 0.5) * step), math.sin((i + 0.5) * step)) for i in range(sides)
+        ]
+        self.inv_length_sq = [
+            1 / (radius * radius * (ex * ex + ey * ey)) for ex, ey in self.unit_edges
+        ]
+        # Distance from the centre to every edge
+        self.apothem = radius * math.cos(step / 2)
+
+        self.set_angle(angle)
+
+    def set_angle(self, angle):
+        """Rotate the polygon to "angle" radians and refresh the world-space geometry."""
+        self.angle = angle
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        cx, cy = self.center
+        r = self.radius
+
+        self.vertices = [
+            (cx + r * (cos_a * ux - sin_a * uy), cy + r * (sin_a * ux + cos_a * uy))
+            for ux, uy in self.unit_vertices
+        ]
+        self.edge_vectors = [
+            (r * (cos_a * ex - sin_a * ey), r * (sin_a * ex + cos_a * ey))
+            for ex, ey in self.unit_edges
+        ]
+        self.normals = [
+            (cos_a * nx - sin_a * ny, sin_a * nx + cos_a * ny) for nx, ny in self.unit_normals
+        ]
+
+    def edges(self):
+        """Yield (start vertex, edge vector, 1 / |edge|^2, outward normal) for every edge."""
+        return zip(self.vertices, self.edge_vectors, self.inv_length_sq, self.normals)
+
+    def closest_point(self, i, p):
+        """Return the point on edge i closest to p."""
+        (ax, ay), (ex, ey) = self.vertices[i], self.edge_vectors[i]
+        t = ((p[0] - ax) * ex + (p[1] - ay) * ey) * self.inv_length_sq[i]
+        t = max(0, min(1, t))
+        return (ax + t * ex, ay + t * ey)
+
+    def gaps(self, p, radius):
+        """Return the clearance between a circle at p and every edge line (negative when overlapping)."""
+        dx = p[0] - self.center[0]
+        dy = p[1] - self.center[1]
+        return [self.apothem - radius - (dx * nx + dy * ny) for nx, ny in self.normals]
+
+    def closing_speed(self, i, p, vel, angular_speed):
+        """
+        Rate at which the gap between a circle at p moving with vel and edge i
+        shrinks while the polygon spins at angular_speed (positive when closing).
+        """
+        nx, ny = self.normals[i]
+        dx = p[0] - self.center[0]
+        dy = p[1] - self.center[1]
+        return vel[0] * nx + vel[1] * ny + angular_speed * (dy * nx - dx * ny)
+
+    def time_of_impact(self, pos, vel, radius, angular_speed, dt, tolerance=1e-3,
+                       max_iterations=64):
+        """
+        Find when a circle inside the polygon, moving from pos with constant
+        vel, first touches an edge while the polygon spins at angular_speed
+        from its current angle. Returns (t, edge index) for a contact at time
+        t <= dt, or (t, None) when the circle is known to be clear up to t:
+        t == dt if no contact happens within the step, or less when
+        max_iterations ran out first.
+
+        Uses conservative advancement: no gap can shrink faster than the
+        circle's speed plus the wall speed at the circle, so advancing by
+        gap / that bound never steps past a contact. An edge already touching
+        but moving apart is not a contact, but a spinning wall can turn back
+        into the circle: such an edge limits each advance through a Taylor
+        bound on its gap (exact closing speed and its rate of change, bounded
+        third term) so that the gap cannot pass -tolerance unseen.
+        """
+        speed = math.hypot(vel[0], vel[1])
+        # Until the contact the circle is inside, so no nearer the rim than the vertices
+        reach = min(math.hypot(pos[0] - self.center[0], pos[1] - self.center[1]) + speed * dt,
+                    self.radius)
+        max_rate = speed + abs(angular_speed) * reach
+        # An edge's closing speed c changes at c' = 2w (v x n) - w^2 (d . n),
+        # and c'' = -3w^2 (v . n) - w^3 (d x n) is at most max_jerk
+        w = angular_speed
+        max_jerk = 3 * w * w * speed + abs(w) ** 3 * reach
+        cos_w = math.cos(self.angle)
+        sin_w = math.sin(self.angle)
+        cx, cy = self.center
+
+        t = 0.0
+        for _ in range(max_iterations):
+            theta = angular_speed * t
+            cos_a = cos_w * math.cos(theta) - sin_w * math.sin(theta)
+            sin_a = sin_w * math.cos(theta) + cos_w * math.sin(theta)
+            dx = pos[0] + vel[0] * t - cx
+            dy = pos[1] + vel[1] * t - cy
+
+            nearest_gap = math.inf
+            advance = math.inf
+            for i, (ux, uy) in enumerate(self.unit_normals):
+                nx = cos_a * ux - sin_a * uy
+                ny = sin_a * ux + cos_a * uy
+                gap = self.apothem - radius - (dx * nx + dy * ny)
+                if gap <= tolerance:
+                    closing = vel[0] * nx + vel[1] * ny + angular_speed * (dy * nx - dx * ny)
+                    if closing > 0:
+                        return t, i
+                    if w:
+                        turn = 2 * w * (vel[1] * nx - vel[0] * ny) - w * w * (dx * nx + dy * ny)
+                        advance = min(advance, self._touching_advance(
+                            gap + tolerance, -closing, turn, max_jerk))
+                    continue
+                nearest_gap = min(nearest_gap, gap)
+
+            if nearest_gap < math.inf and max_rate > 0:
+                advance = min(advance, nearest_gap / max_rate)
+            if advance == math.inf:
+                return dt, None
+            t += max(advance, tolerance / max_rate)
+            if t >= dt:
+                return dt, None
+        return t, None
+
+    @staticmethod
+    def _touching_advance(room, separating, turn, jerk):
+        """
+        A step h that keeps room + separating * h - turn * h^2 / 2 - jerk * h^3 / 6
+        non-negative throughout, for room, separating, jerk >= 0: how far a
+        touching, separating edge lets the circle advance.
+        """
+        room = max(room, 0.0)
+        if turn <= 0:
+            # The closing speed is falling; the cubic term only wins after 3|turn| / jerk
+            if jerk == 0:
+                return math.inf
+            return max(-3 * turn / jerk, (6 * room / jerk) ** (1 / 3))
+        # Give each of the two negative terms half the room and the separation
+        h = (separating + math.sqrt(separating * separating + 4 * turn * room)) / (2 * turn)
+        if jerk:
+            h = min(h, (3 * room / jerk) ** (1 / 3))
+        return h
+
+    def sweep_circle(self, pos, vel, radius, angular_speed, dt, bounce, max_hits=8):
+        """
+        Advance a circle inside the spinning polygon by dt, reflecting its
+        velocity (scaled by bounce) at the exact time of each wall contact.
+        Steps without a contact are taken whole; only steps that reach a wall
+        are split at the impact times. If the wall is moving inwards faster
+        than the rebound, the circle is carried along with it. After
+        max_hits contacts in one step (a circle pinned in a corner), the rest
+        of the step turns it with the polygon, which keeps its clearance to
+        every wall. The polygon ends the step rotated by angular_speed * dt.
+        Returns (pos, vel, number of wall hits).
+        """
+        remaining = dt
+        hits = 0
+        while remaining > 0:
+            t, i = self.time_of_impact(pos, vel, radius, angular_speed, remaining)
+            pos = [pos[0] + vel[0] * t, pos[1] + vel[1] * t]
+            self.set_angle(self.angle + angular_speed * t)
+            remaining -= t
+            if i is None:
+                # Clear up to t: either the end of the step, or as far as
+                # time_of_impact got before running out of iterations
+                continue
+            hits += 1
+
+            nx, ny = self.normals[i]
+            dot = vel[0] * nx + vel[1] * ny
+            vel = [(vel[0] - 2 * dot * nx) * bounce, (vel[1] - 2 * dot * ny) * bounce]
+            closing = self.closing_speed(i, pos, vel, angular_speed)
+            if closing > 0:
+                vel = [vel[0] - closing * nx, vel[1] - closing * ny]
+
+            if hits == max_hits:
+                theta = angular_speed * remaining
+                cos_t = math.cos(theta)
+                sin_t = math.sin(theta)
+                cx, cy = self.center
+                dx = pos[0] - cx
+                dy = pos[1] - cy
+                pos = [cx + cos_t * dx - sin_t * dy, cy + sin_t * dx + cos_t * dy]
+                vel = [cos_t * vel[0] - sin_t * vel[1], sin_t * vel[0] + cos_t * vel[1]]
+                self.set_angle(self.angle + theta)
+                break
+        return pos, vel, hits
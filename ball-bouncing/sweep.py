@@ -0,0 +1,242 @@
+import argparse
+import copy
+import importlib
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# A ball counts as escaped once its centre is this far outside a wall
+ESCAPE_MARGIN = 1.0
+
+# A ball has stalled when its final kinetic energy is below this fraction of
+# gravity times the hexagon radius, the energy of a drop across the hexagon
+STALL_FRACTION = 1e-3
+
+# Grid axes. Gravity and spin are multipliers of each variant's own
+# defaults, since the variants use different units; restitution and
+# collision friction are the dimensionless factors themselves.
+AXES = ['gravity_scale', 'restitution', 'friction', 'spin_scale']
+
+COLUMNS = AXES + ['variant', 'escape_step', 'bounces', 'energy_start', 'energy_end',
+                  'kinetic_end', 'stalled']
+
+
+def _setup_trae(module, defaults, cell, seed):
+    module.GRAVITY = defaults['GRAVITY'] * cell['gravity_scale']
+    module.BOUNCE_FACTOR = cell['restitution']
+    ball = module.Ball(module.WIDTH // 2, module.HEIGHT // 2)
+    hexagon = module.Hexagon(module.WIDTH // 2, module.HEIGHT // 2)
+    hexagon.rotation_speed *= cell['spin_scale']
+
+    def advance():
+        return module.step(ball, hexagon)
+
+    def state():
+        return ball.x, ball.y, ball.vel_x, ball.vel_y
+
+    return advance, state, hexagon.polygon, module.GRAVITY
+
+
+def _setup_grok(module, defaults, cell, seed):
+    module.GRAVITY = defaults['GRAVITY'] * cell['gravity_scale']
+    module.BOUNCE = cell['restitution']
+    module.rotation_speed = defaults['rotation_speed'] * cell['spin_scale']
+    # The game picks a random horizontal launch speed; seed it per cell
+    module.reset(seed)
+
+    def state():
+        return (*module.ball_pos, *module.ball_vel)
+
+    return module.step_physics, state, module.hexagon, module.GRAVITY
+
+
+def _setup_cursor(module, defaults, cell, seed):
+    module.GRAVITY = defaults['GRAVITY'] * cell['gravity_scale']
+    module.RESTITUTION = cell['restitution']
+    module.COLLISION_FRICTION = cell['friction']
+    module.HEX_ANGULAR_SPEED = defaults['HEX_ANGULAR_SPEED'] * cell['spin_scale']
+    module.hexagon_angle = 0.0
+    module.ball_pos[:] = defaults['ball_pos']
+    module.ball_velocity[:] = defaults['ball_velocity']
+
+    def advance():
+        return module.step_physics(module.PHYSICS_DT)
+
+    def state():
+        return (*module.ball_pos, *module.ball_velocity)
+
+    return advance, state, module.hexagon, module.GRAVITY
+
+
+# name -> (directory, module, module globals to restore between cells,
+#          axes the variant has, setup function)
+VARIANTS = {
+    'trae-claude': ('trae-claude', 'bouncing_ball', ['GRAVITY', 'BOUNCE_FACTOR'],
+                    ['gravity_scale', 'restitution', 'spin_scale'], _setup_trae),
+    'grok-3': ('grok-3', 'hexagon', ['GRAVITY', 'BOUNCE', 'rotation_speed'],
+               ['gravity_scale', 'restitution', 'spin_scale'], _setup_grok),
+    'cursor-o3-mini': ('cursor-o3-mini', 'bouncing_ball_hexagon',
+                       ['GRAVITY', 'RESTITUTION', 'COLLISION_FRICTION', 'HEX_ANGULAR_SPEED',
+                        'ball_pos', 'ball_velocity'],
+                       AXES, _setup_cursor),
+}
+
+# Imported variant modules and their untouched globals, per worker process
+_loaded = {}
+
+
+def load_variant(name):
+    if name not in _loaded:
+        directory, module_name, keys, _, _ = VARIANTS[name]
+        sys.path.insert(0, os.path.join(ROOT, directory))
+        module = importlib.import_module(module_name)
+        _loaded[name] = module, {key: copy.deepcopy(getattr(module, key)) for key in keys}
+    return _loaded[name]
+
+
+def run_cell(cell, steps, seed):
+    # Run one variant headlessly with the cell's parameters and measure it
+    name = cell['variant']
+    module, defaults = load_variant(name)
+    advance, state, polygon, gravity = VARIANTS[name][4](module, defaults, cell, seed)
+    cx, cy = polygon.center
+
+    def energy(x, y, vel_x, vel_y):
+        # Per unit mass, with the potential measured from the centre (y points down)
+        return 0.5 * (vel_x * vel_x + vel_y * vel_y) + gravity * (cy - y)
+
+    energy_start = energy(*state())
+    escape_step = -1
+    bounces = 0
+    for step in range(steps):
+        bounces += advance()
+        x, y, _, _ = state()
+        if min(polygon.gaps((x, y), 0)) < -ESCAPE_MARGIN:
+            escape_step = step + 1
+            break
+
+    x, y, vel_x, vel_y = state()
+    kinetic_end = 0.5 * (vel_x * vel_x + vel_y * vel_y)
+    return dict(escape_step=escape_step, bounces=bounces, energy_start=energy_start,
+                energy_end=energy(x, y, vel_x, vel_y), kinetic_end=kinetic_end,
+                stalled=escape_step < 0 and kinetic_end < STALL_FRACTION * gravity * polygon.radius)
+
+
+def run_chunk(cells, steps, first_index):
+    # Worker entry point: one columnar dict for a contiguous run of cells
+    columns = {column: [] for column in COLUMNS}
+    for offset, cell in enumerate(cells):
+        result = run_cell(cell, steps, seed=first_index + offset)
+        for column in COLUMNS:
+            columns[column].append(cell[column] if column in cell else result[column])
+    return {column: np.array(values) for column, values in columns.items()}
+
+
+def build_cells(variants, grid):
+    # Every combination of the axes each variant has; missing axes are NaN
+    cells = []
+    for name in variants:
+        axes = VARIANTS[name][3]
+        for values in itertools.product(*(grid[axis] for axis in axes)):
+            cell = dict.fromkeys(AXES, math.nan)
+            cell.update(zip(axes, values), variant=name)
+            cells.append(cell)
+    return cells
+
+
+def chunk_path(output, index):
+    return os.path.join(output, f"chunk-{index:05d}.npz")
+
+
+def write_chunk(output, index, columns):
+    # Write under a temporary name first so an interrupted write never
+    # looks like a finished chunk
+    path = chunk_path(output, index)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, **columns)
+    os.replace(path + '.tmp', path)
+
+
+def merge_chunks(output, chunks):
+    parts = []
+    for index in range(chunks):
+        with np.load(chunk_path(output, index)) as data:
+            parts.append({column: data[column] for column in COLUMNS})
+    merged = {column: np.concatenate([part[column] for part in parts]) for column in COLUMNS}
+    with open(os.path.join(output, 'results.npz'), 'wb') as f:
+        np.savez(f, **merged)
+    return merged
+
+
+def print_summary(results):
+    print(f"{'variant':>16} {'cells':>6} {'escaped':>8} {'stalled':>8} {'bounces':>8}")
+    for name in dict.fromkeys(results['variant'].tolist()):
+        rows = results['variant'] == name
+        print(f"{name:>16} {rows.sum():>6} {(results['escape_step'][rows] >= 0).mean():>8.1%} "
+              f"{results['stalled'][rows].mean():>8.1%} {results['bounces'][rows].mean():>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sweep physics parameters over the hexagon variants on all cores')
+    parser.add_argument('output', help='Directory for the manifest, result chunks and results.npz')
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--gravity-scale', nargs='+', type=float, default=[1.0],
+                        help="Multipliers of each variant's gravity")
+    parser.add_argument('--restitution', nargs='+', type=float, default=[0.85],
+                        help='Bounce factors (BOUNCE_FACTOR, BOUNCE or RESTITUTION)')
+    parser.add_argument('--friction', nargs='+', type=float, default=[0.8],
+                        help='Tangential collision friction (cursor-o3-mini only)')
+    parser.add_argument('--spin-scale', nargs='+', type=float, default=[1.0],
+                        help="Multipliers of each variant's angular speed")
+    parser.add_argument('--steps', type=int, default=3600,
+                        help='Physics steps per cell (default: 3600)')
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help='Cells per scheduled task and result file (default: 16)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    grid = {'gravity_scale': args.gravity_scale, 'restitution': args.restitution,
+            'friction': args.friction, 'spin_scale': args.spin_scale}
+    manifest = {'variants': args.variants, 'grid': grid, 'steps': args.steps,
+                'chunk_size': args.chunk_size}
+
+    # A manifest pins the cell order to chunk files; resuming needs the same one
+    os.makedirs(args.output, exist_ok=True)
+    manifest_path = os.path.join(args.output, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) != manifest:
+                parser.error(f"{args.output} holds a different sweep; use a new directory")
+    else:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    cells = build_cells(args.variants, grid)
+    chunks = [cells[i:i + args.chunk_size] for i in range(0, len(cells), args.chunk_size)]
+    pending = [index for index in range(len(chunks))
+               if not os.path.exists(chunk_path(args.output, index))]
+    print(f"{len(cells)} cells in {len(chunks)} chunks, {len(chunks) - len(pending)} already done",
+          file=sys.stderr)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_chunk, chunks[index], args.steps, index * args.chunk_size): index
+                   for index in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            write_chunk(args.output, futures[future], future.result())
+            print(f"chunk {futures[future]} done ({done}/{len(pending)})", file=sys.stderr)
+
+    print_summary(merge_chunks(args.output, len(chunks)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
 import pygame
+import argparse
+import csv
 import sys
 import math
+import os
+import time
+from collections import OrderedDict
 
-# Initialize Pygame
-pygame.init()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_profiler import FrameProfiler
+from rotating_polygon import RotatingPolygon
+from video_export import ExportClock, VideoExporter, use_dummy_display
 
 # Constants
 WIDTH = 800
@@ -23,11 +30,42 @@ NEON_COLORS = [
     (0, 255, 0)     # Green
 ]
 
+# Glow sprites are cached per (radius, color); least recently used entries
+# are dropped once this many combinations have been drawn
+GLOW_CACHE_SIZE = 64
+
 # Physics constants
 GRAVITY = 0.5
 FRICTION = 0.98
 BOUNCE_FACTOR = 0.85
 
+_glow_cache = OrderedDict()
+
+# Phase timings; disabled unless main() is asked to profile
+profiler = FrameProfiler()
+
+def get_glow_sprites(radius, color):
+    # Pre-render the three glow layers once and reuse them every frame
+    key = (radius, color)
+    sprites = _glow_cache.get(key)
+    if sprites is not None:
+        _glow_cache.move_to_end(key)
+        return sprites
+
+    sprites = []
+    for i in range(3):
+        glow_radius = radius + i * 2
+        alpha = 100 - i * 30
+        glow_surface = pygame.Surface((glow_radius * 2 + 4, glow_radius * 2 + 4), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surface, (*color[:3], alpha), 
+                         (glow_radius + 2, glow_radius + 2), glow_radius)
+        sprites.append((glow_surface, glow_radius + 2))
+
+    _glow_cache[key] = sprites
+    if len(_glow_cache) > GLOW_CACHE_SIZE:
+        _glow_cache.popitem(last=False)
+    return sprites
+
 class Ball:
     def __init__(self, x, y, radius=10):
         self.x = x
@@ -35,6 +73,7 @@ class Ball:
         self.radius = radius
         self.vel_x = 0
         self.vel_y = 0
+        self.color = NEON_COLORS[0]
 
     def update(self):
         # Apply gravity
@@ -50,17 +89,12 @@ class Ball:
 
     def draw(self, screen):
         # Draw glow effect
-        for i in range(3):
-            glow_radius = self.radius + i * 2
-            alpha = 100 - i * 30
-            glow_surface = pygame.Surface((glow_radius * 2 + 4, glow_radius * 2 + 4), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*NEON_COLORS[0][:3], alpha), 
-                             (glow_radius + 2, glow_radius + 2), glow_radius)
-            screen.blit(glow_surface, 
-                       (int(self.x - glow_radius - 2), int(self.y - glow_radius - 2)))
+        screen.blits([(glow_surface, (int(self.x - offset), int(self.y - offset)))
+                      for glow_surface, offset in get_glow_sprites(self.radius, self.color)],
+                     doreturn=False)
         
         # Draw the main ball
-        pygame.draw.circle(screen, NEON_COLORS[0], (int(self.x), int(self.y)), self.radius)
+        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
 
 class Hexagon:
     def __init__(self, center_x, center_y, radius=150):
@@ -69,18 +103,14 @@ class Hexagon:
         self.radius = radius
         self.angle = 0
         self.rotation_speed = 0.02
+        self.polygon = RotatingPolygon((center_x, center_y), radius, 6, self.angle)
 
     def get_points(self):
-        points = []
-        for i in range(6):
-            angle = self.angle + (i * math.pi / 3)
-            x = self.center_x + self.radius * math.cos(angle)
-            y = self.center_y + self.radius * math.sin(angle)
-            points.append((x, y))
-        return points
+        return self.polygon.vertices
 
     def rotate(self):
         self.angle += self.rotation_speed
+        self.polygon.set_angle(self.angle)
 
     def draw(self, screen):
         points = self.get_points()
@@ -102,28 +132,23 @@ class Hexagon:
             pygame.draw.polygon(screen, color, points, width)
 
     def check_collision(self, ball):
-        points = self.get_points()
-        for i in range(6):
-            p1 = points[i]
-            p2 = points[(i + 1) % 6]
-            
+        collided = False
+        for p1, wall_vec, inv_wall_length_sq, _ in self.polygon.edges():
             # Check collision with each wall segment
-            self.handle_line_collision(ball, p1, p2)
+            if self.handle_line_collision(ball, p1, wall_vec, inv_wall_length_sq):
+                collided = True
+        return collided
 
-    def handle_line_collision(self, ball, p1, p2):
-        # Vector from p1 to p2
-        wall_vec_x = p2[0] - p1[0]
-        wall_vec_y = p2[1] - p1[1]
+    def handle_line_collision(self, ball, p1, wall_vec, inv_wall_length_sq):
+        # Vector from p1 to p2, precomputed by the polygon
+        wall_vec_x, wall_vec_y = wall_vec
         
         # Vector from p1 to ball
         ball_vec_x = ball.x - p1[0]
         ball_vec_y = ball.y - p1[1]
         
-        # Wall length squared
-        wall_length_sq = wall_vec_x * wall_vec_x + wall_vec_y * wall_vec_y
-        
         # Projection of ball vector onto wall vector
-        t = max(0, min(1, (ball_vec_x * wall_vec_x + ball_vec_y * wall_vec_y) / wall_length_sq))
+        t = max(0, min(1, (ball_vec_x * wall_vec_x + ball_vec_y * wall_vec_y) * inv_wall_length_sq))
         
         # Closest point on the line
         closest_x = p1[0] + t * wall_vec_x
@@ -152,33 +177,109 @@ class Hexagon:
                 overlap = ball.radius - distance
                 ball.x += overlap * normal_x
                 ball.y += overlap * normal_y
+                return True
+        return False
+
+def step(ball, hexagon):
+    # Advance the simulation by one frame; returns True if the ball hit a wall
+    ball.update()
+    hexagon.rotate()
+    profiler.mark('physics')
+    collided = hexagon.check_collision(ball)
+    profiler.mark('collision')
+    return collided
+
+def simulate(steps):
+    # Run the physics without a display or frame limiter and return the
+    # (x, y, vel_x, vel_y, hexagon angle) state after every step
+    ball = Ball(WIDTH // 2, HEIGHT // 2)
+    hexagon = Hexagon(WIDTH // 2, HEIGHT // 2)
+    trajectory = []
+    for _ in range(steps):
+        step(ball, hexagon)
+        trajectory.append((ball.x, ball.y, ball.vel_x, ball.vel_y, hexagon.angle))
+    return trajectory
+
+def run_headless(steps, trajectory_path=None):
+    start = time.perf_counter()
+    trajectory = simulate(steps)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {steps} steps in {elapsed:.3f}s "
+          f"({steps / elapsed:.0f} steps/sec, {steps / elapsed / FPS:.0f}x real time)")
+
+    if trajectory_path:
+        with open(trajectory_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['step', 'x', 'y', 'vel_x', 'vel_y', 'angle'])
+            for i, state in enumerate(trajectory):
+                writer.writerow([i + 1, *state])
+    return trajectory
 
 def main():
+    global profiler
+    parser = argparse.ArgumentParser(description='Bouncing ball in a rotating hexagon')
+    parser.add_argument('--headless', type=int, metavar='STEPS',
+                        help='Simulate this many steps without a window and report steps/sec')
+    parser.add_argument('--trajectory', help='With --headless, write the per-step state to this CSV')
+    parser.add_argument('--export', metavar='PATH',
+                        help='Render offscreen as fast as possible and write a video to PATH')
+    parser.add_argument('--duration', type=float, default=60,
+                        help='Length of the exported video in seconds (default: 60)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Show per-phase frame timings (p50/p99) on screen')
+    parser.add_argument('--profile-output', metavar='PATH',
+                        help='Write per-frame phase timings to PATH (.csv or .json)')
+    args = parser.parse_args()
+
+    if args.headless is not None:
+        run_headless(args.headless, args.trajectory)
+        return
+
+    exporter = None
+    if args.export:
+        use_dummy_display()
+    pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Bouncing Ball in Rotating Hexagon")
-    clock = pygame.time.Clock()
+    if args.export:
+        clock = ExportClock(FPS)
+        exporter = VideoExporter(args.export, (WIDTH, HEIGHT), FPS, args.duration)
+    else:
+        clock = pygame.time.Clock()
 
     ball = Ball(WIDTH // 2, HEIGHT // 2)
     hexagon = Hexagon(WIDTH // 2, HEIGHT // 2)
+    profiler = FrameProfiler(args.profile, args.profile_output)
 
-    while True:
+    running = True
+    while running:
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                running = False
+        profiler.mark('events')
 
         # Update
-        ball.update()
-        hexagon.rotate()
-        hexagon.check_collision(ball)
+        step(ball, hexagon)
 
         # Draw
         screen.fill(BLACK)
         hexagon.draw(screen)
         ball.draw(screen)
+        profiler.draw(screen)
         
         pygame.display.flip()
+        profiler.mark('render')
+        profiler.end_frame()
+        if exporter is not None:
+            exporter.write(screen)
+            running = not exporter.done
         clock.tick(FPS)
 
+    if exporter is not None:
+        exporter.close()
+    profiler.close()
+    pygame.quit()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,316 @@
+import pygame
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from bouncing_ball import (
+    BLACK,
+    BOUNCE_FACTOR,
+    FPS,
+    FRICTION,
+    GRAVITY,
+    HEIGHT,
+    NEON_COLORS,
+    WIDTH,
+    Ball,
+    Hexagon,
+)
+
+# Ball counts timed by --benchmark; the per-object loop stops at the smaller sizes
+BENCHMARK_SIZES = [100, 1000, 10000, 100000]
+OBJECT_BENCHMARK_LIMIT = 1000
+
+# Fraction of the hexagon covered by balls in the ball-ball benchmark
+CROWDED_COVERAGE = 0.4
+
+# Neighbour cells searched for each occupied cell. Only half the 3x3
+# neighbourhood is needed, since every pair of adjacent cells is met once.
+NEIGHBOUR_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+# Grid keys are cell_x * CELL_STRIDE + cell_y
+CELL_STRIDE = 1 << 32
+
+
+class BallArray:
+    # Structure-of-arrays version of Ball: positions and velocities of every
+    # ball live in NumPy arrays, so one update advances all of them
+    def __init__(self, x, y, radius=10):
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+        self.radius = radius
+        self.vel_x = np.zeros_like(self.x)
+        self.vel_y = np.zeros_like(self.y)
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self):
+        # Apply gravity
+        self.vel_y += GRAVITY
+
+        # Apply friction
+        self.vel_x *= FRICTION
+        self.vel_y *= FRICTION
+
+        # Update position
+        self.x += self.vel_x
+        self.y += self.vel_y
+
+    def draw(self, screen):
+        color = NEON_COLORS[0]
+        for x, y in zip(self.x.astype(int), self.y.astype(int)):
+            pygame.draw.circle(screen, color, (x, y), self.radius)
+
+
+def check_collisions(hexagon, balls):
+    # Hexagon.handle_line_collision for every ball at once. Edges are still
+    # visited in order, so a ball touching two walls resolves exactly as the
+    # per-object version does. Returns a mask of balls that hit a wall.
+    collided = np.zeros(len(balls), dtype=bool)
+    for (x1, y1), (wall_vec_x, wall_vec_y), inv_wall_length_sq, _ in hexagon.polygon.edges():
+        # Closest point on the wall to every ball
+        t = ((balls.x - x1) * wall_vec_x + (balls.y - y1) * wall_vec_y) * inv_wall_length_sq
+        np.clip(t, 0, 1, out=t)
+        dist_x = balls.x - (x1 + t * wall_vec_x)
+        dist_y = balls.y - (y1 + t * wall_vec_y)
+        distance = np.hypot(dist_x, dist_y)
+
+        hit = np.flatnonzero((distance <= balls.radius) & (distance > 0))
+        if len(hit) == 0:
+            continue
+        distance = distance[hit]
+        normal_x = dist_x[hit] / distance
+        normal_y = dist_y[hit] / distance
+
+        # Apply bounce
+        dot_product = balls.vel_x[hit] * normal_x + balls.vel_y[hit] * normal_y
+        balls.vel_x[hit] -= (1 + BOUNCE_FACTOR) * dot_product * normal_x
+        balls.vel_y[hit] -= (1 + BOUNCE_FACTOR) * dot_product * normal_y
+
+        # Move balls outside the wall
+        overlap = balls.radius - distance
+        balls.x[hit] += overlap * normal_x
+        balls.y[hit] += overlap * normal_y
+        collided[hit] = True
+    return collided
+
+
+class SpatialHash:
+    # Uniform grid broad phase for ball-ball collisions. Cells are one ball
+    # diameter wide, so touching balls always share a cell or sit in
+    # neighbouring cells. Balls are kept sorted by cell key; each rebuild
+    # starts from the previous step's order, which is already almost sorted
+    # because balls rarely change cell, so the stable (adaptive) sort costs
+    # close to linear time.
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.order = None
+
+    def candidate_pairs(self, x, y):
+        cell_x = np.floor(x / self.cell_size).astype(np.int64)
+        cell_y = np.floor(y / self.cell_size).astype(np.int64)
+        keys = cell_x * CELL_STRIDE + cell_y
+
+        if self.order is None or len(self.order) != len(keys):
+            self.order = np.arange(len(keys))
+        sorted_keys = keys[self.order]
+        resort = np.argsort(sorted_keys, kind='stable')
+        self.order = self.order[resort]
+        sorted_keys = sorted_keys[resort]
+
+        # Occupied cells as runs in the sorted order
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+        cell_keys = sorted_keys[starts]
+
+        first = []
+        second = []
+        for dx, dy in NEIGHBOUR_OFFSETS:
+            neighbour = np.searchsorted(cell_keys, cell_keys + dx * CELL_STRIDE + dy)
+            neighbour = np.minimum(neighbour, len(cell_keys) - 1)
+            cell = np.flatnonzero(cell_keys[neighbour] == cell_keys + dx * CELL_STRIDE + dy)
+            if len(cell) == 0:
+                continue
+            neighbour = neighbour[cell]
+
+            # Every ball in the cell against every ball in the neighbour
+            count_a = counts[cell]
+            count_b = counts[neighbour]
+            block_sizes = count_a * count_b
+            block = np.repeat(np.arange(len(cell)), block_sizes)
+            local = np.arange(len(block)) - np.repeat(np.cumsum(block_sizes) - block_sizes,
+                                                      block_sizes)
+            a = starts[cell][block] + local // count_b[block]
+            b = starts[neighbour][block] + local % count_b[block]
+            if dx == 0 and dy == 0:
+                keep = a < b
+                a = a[keep]
+                b = b[keep]
+            first.append(self.order[a])
+            second.append(self.order[b])
+
+        if not first:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        return np.concatenate(first), np.concatenate(second)
+
+
+def resolve_ball_collisions(balls, grid):
+    # Equal-mass elastic-ish collisions between touching balls, using the
+    # same restitution as the walls. Impulses and overlap corrections from
+    # every contact are summed, so a ball in several contacts at once is
+    # resolved in one pass. Returns the number of colliding pairs.
+    i, j = grid.candidate_pairs(balls.x, balls.y)
+    dx = balls.x[j] - balls.x[i]
+    dy = balls.y[j] - balls.y[i]
+    distance_sq = dx * dx + dy * dy
+    min_distance = 2 * balls.radius
+    touching = np.flatnonzero((distance_sq < min_distance * min_distance) & (distance_sq > 0))
+    if len(touching) == 0:
+        return 0
+    i = i[touching]
+    j = j[touching]
+    distance = np.sqrt(distance_sq[touching])
+    normal_x = dx[touching] / distance
+    normal_y = dy[touching] / distance
+
+    # Only balls moving towards each other exchange momentum
+    closing = ((balls.vel_x[j] - balls.vel_x[i]) * normal_x +
+               (balls.vel_y[j] - balls.vel_y[i]) * normal_y)
+    impulse = np.where(closing < 0, -(1 + BOUNCE_FACTOR) * closing / 2, 0.0)
+    np.add.at(balls.vel_x, i, -impulse * normal_x)
+    np.add.at(balls.vel_y, i, -impulse * normal_y)
+    np.add.at(balls.vel_x, j, impulse * normal_x)
+    np.add.at(balls.vel_y, j, impulse * normal_y)
+
+    # Push both balls apart by half the overlap
+    push = (min_distance - distance) / 2
+    np.add.at(balls.x, i, -push * normal_x)
+    np.add.at(balls.y, i, -push * normal_y)
+    np.add.at(balls.x, j, push * normal_x)
+    np.add.at(balls.y, j, push * normal_y)
+    return len(touching)
+
+
+def step_many(balls, hexagon, grid=None):
+    # Vectorized counterpart of bouncing_ball.step; with a SpatialHash, balls
+    # also collide with each other before the walls are resolved
+    balls.update()
+    hexagon.rotate()
+    if grid is not None:
+        resolve_ball_collisions(balls, grid)
+    return check_collisions(hexagon, balls)
+
+
+def spawn_balls(count, hexagon, radius=10, seed=0):
+    # Scatter balls uniformly over a disc well inside the hexagon
+    rng = np.random.default_rng(seed)
+    spread = hexagon.radius * 0.8 - radius
+    r = spread * np.sqrt(rng.random(count))
+    theta = rng.uniform(0, 2 * np.pi, count)
+    return BallArray(hexagon.center_x + r * np.cos(theta),
+                     hexagon.center_y + r * np.sin(theta), radius)
+
+
+def time_steps(advance, steps):
+    start = time.perf_counter()
+    for _ in range(steps):
+        advance()
+    return (time.perf_counter() - start) / steps
+
+
+def benchmark(steps=120):
+    # Seconds per step for both engines, and how many balls each could
+    # advance within one 60 fps frame at that rate
+    frame_budget = 1 / FPS
+    print(f"{'balls':>8} {'engine':>8} {'ms/step':>9} {'balls/frame':>12}")
+    for count in BENCHMARK_SIZES:
+        hexagon = Hexagon(WIDTH // 2, HEIGHT // 2)
+        balls = spawn_balls(count, hexagon)
+        seconds = time_steps(lambda: step_many(balls, hexagon), steps)
+        print(f"{count:>8} {'numpy':>8} {seconds * 1000:>9.3f} "
+              f"{int(count * frame_budget / seconds):>12}")
+
+        if count > OBJECT_BENCHMARK_LIMIT:
+            continue
+        hexagon = Hexagon(WIDTH // 2, HEIGHT // 2)
+        objects = [Ball(x, y) for x, y in zip(balls.x, balls.y)]
+
+        def step_objects():
+            hexagon.rotate()
+            for ball in objects:
+                ball.update()
+                hexagon.check_collision(ball)
+
+        seconds = time_steps(step_objects, steps)
+        print(f"{count:>8} {'objects':>8} {seconds * 1000:>9.3f} "
+              f"{int(count * frame_budget / seconds):>12}")
+
+    # Ball-ball collisions in a crowded hexagon: the radius shrinks with the
+    # count so the balls always cover the same share of the spawn disc, and
+    # the cost per ball should stay roughly flat as the count grows
+    print()
+    print(f"{'balls':>8} {'radius':>8} {'ms/step':>9} {'us/ball':>9} {'contacts':>9}")
+    for count in BENCHMARK_SIZES:
+        hexagon = Hexagon(WIDTH // 2, HEIGHT // 2)
+        spawn_area = np.pi * (hexagon.radius * 0.8) ** 2
+        radius = np.sqrt(CROWDED_COVERAGE * spawn_area / (count * np.pi))
+        balls = spawn_balls(count, hexagon, radius)
+        grid = SpatialHash(2 * radius)
+        contacts = 0
+
+        def step_crowded():
+            nonlocal contacts
+            balls.update()
+            hexagon.rotate()
+            contacts += resolve_ball_collisions(balls, grid)
+            check_collisions(hexagon, balls)
+
+        seconds = time_steps(step_crowded, steps)
+        print(f"{count:>8} {radius:>8.2f} {seconds * 1000:>9.3f} "
+              f"{seconds * 1e6 / count:>9.3f} {contacts // steps:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Many balls in a rotating hexagon')
+    parser.add_argument('--balls', type=int, default=500, help='Number of balls (default: 500)')
+    parser.add_argument('--collide', action='store_true',
+                        help='Let balls collide with each other')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare the NumPy engine against the per-object loop')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Many Balls in Rotating Hexagon")
+    clock = pygame.time.Clock()
+
+    hexagon = Hexagon(WIDTH // 2, HEIGHT // 2)
+    balls = spawn_balls(args.balls, hexagon, radius=3)
+    grid = SpatialHash(2 * balls.radius) if args.collide else None
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+
+        # Update
+        step_many(balls, hexagon, grid)
+
+        # Draw
+        screen.fill(BLACK)
+        hexagon.draw(screen)
+        balls.draw(screen)
+
+        pygame.display.flip()
+        clock.tick(FPS)
+
+
+if __name__ == "__main__":
+    main()
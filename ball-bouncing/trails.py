@@ -0,0 +1,81 @@
+import numpy as np
+import pygame
+
+
+class Trails:
+    """
+    Fading trails behind any number of balls.
+
+    The last "length" positions of every ball are kept in a fixed-size ring
+    buffer, so pushing a frame overwrites the oldest one instead of growing
+    a list. Each age has a pre-rendered circle sprite from a linear alpha
+    ramp, and drawing is a single Surface.blits call: the cost depends on
+    trail length times ball count, not on the window size.
+    """
+
+    def __init__(self, balls, length, radius, max_alpha=80):
+        self.length = length
+        self.radius = radius
+        self.positions = np.zeros((length, balls, 2), dtype=np.int32)
+        self.head = 0
+        self.count = 0
+
+        # White sprites from newest (most opaque) to oldest; draw() tints them
+        size = 2 * radius + 1
+        self.white_sprites = []
+        for age in range(length):
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            alpha = round(max_alpha * (length - age) / length)
+            pygame.draw.circle(sprite, (255, 255, 255, alpha), (radius, radius), radius)
+            self.white_sprites.append(sprite)
+        self.color = None
+        self.sprites = None
+
+    def push(self, positions):
+        """Record one frame of ball centres, an array-like of shape (balls, 2)."""
+        self.positions[self.head] = positions
+        self.head = (self.head + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+
+    def clear(self):
+        self.count = 0
+
+    def _ages(self):
+        # Ring buffer slots from oldest to newest, with their ages
+        ages = np.arange(self.count - 1, -1, -1)
+        return (self.head - 1 - ages) % self.length, ages
+
+    def bounds(self):
+        """Return the pygame.Rect covering every trail sprite, or None when empty."""
+        if self.count == 0:
+            return None
+        slots, _ = self._ages()
+        points = self.positions[slots].reshape(-1, 2)
+        left, top = points.min(axis=0) - self.radius
+        right, bottom = points.max(axis=0) + self.radius + 1
+        return pygame.Rect(int(left), int(top), int(right - left), int(bottom - top))
+
+    def draw(self, surface, color):
+        """Blit every trail in the given RGB colour, oldest positions first."""
+        if self.count == 0:
+            return
+        if color != self.color:
+            # Multiplying white by the colour gives exactly that colour and
+            # leaves the ramp's alpha untouched
+            self.sprites = []
+            for white in self.white_sprites:
+                sprite = white.copy()
+                sprite.fill((*color, 255), special_flags=pygame.BLEND_RGBA_MULT)
+                self.sprites.append(sprite)
+            self.color = color
+
+        slots, ages = self._ages()
+        corners = (self.positions[slots] - self.radius).tolist()
+        surface.blits(
+            [
+                (self.sprites[age], corner)
+                for age, frame in zip(ages.tolist(), corners)
+                for corner in frame
+            ],
+            doreturn=False,
+        )
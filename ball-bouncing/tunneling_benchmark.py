@@ -0,0 +1,129 @@
+import argparse
+import math
+import random
+import time
+
+from rotating_polygon import RotatingPolygon
+
+# Hexagon and ball sizes of grok-3/hexagon.py
+HEX_RADIUS = 300
+BALL_RADIUS = 20
+GRAVITY = 0.2
+BOUNCE = 0.8
+
+# Frames advanced per physics step, and hexagon spin in degrees per frame
+TIMESTEPS = [1, 4, 16]
+ROTATION_SPEEDS = [0.5, 5, 20]
+
+# Largest initial ball speed, in pixels per frame
+MAX_SPEED = 30
+
+# A ball counts as escaped once its centre is this far outside a wall, which
+# allows for rounding when the centre-path scheme parks it on the wall
+ESCAPE_MARGIN = 1.0
+
+
+def discrete_step(polygon, pos, vel, omega, dt):
+    # Move first, then push the ball out of any wall it overlaps (the
+    # trae-claude and cursor-o3-mini scheme)
+    polygon.set_angle(polygon.angle + omega * dt)
+    pos = [pos[0] + vel[0] * dt, pos[1] + vel[1] * dt]
+    for i in range(polygon.sides):
+        cx, cy = polygon.closest_point(i, pos)
+        dx = pos[0] - cx
+        dy = pos[1] - cy
+        distance = math.hypot(dx, dy)
+        if 0 < distance < BALL_RADIUS:
+            nx = dx / distance
+            ny = dy / distance
+            dot = vel[0] * nx + vel[1] * ny
+            if dot < 0:
+                vel = [(vel[0] - 2 * dot * nx) * BOUNCE, (vel[1] - 2 * dot * ny) * BOUNCE]
+            pos = [pos[0] + nx * (BALL_RADIUS - distance), pos[1] + ny * (BALL_RADIUS - distance)]
+    return pos, vel
+
+
+def centre_path_step(polygon, pos, vel, omega, dt):
+    # Intersect the centre's path with each wall, ignoring the ball radius
+    # (the original grok-3 scheme)
+    polygon.set_angle(polygon.angle + omega * dt)
+    new_pos = [pos[0] + vel[0] * dt, pos[1] + vel[1] * dt]
+    px = new_pos[0] - pos[0]
+    py = new_pos[1] - pos[1]
+    for (ax, ay), (ex, ey), _, (nx, ny) in polygon.edges():
+        denom = px * ey - py * ex
+        if denom == 0:
+            continue
+        s = ((ax - pos[0]) * ey - (ay - pos[1]) * ex) / denom
+        u = ((ax - pos[0]) * py - (ay - pos[1]) * px) / denom
+        if 0 <= s <= 1 and 0 <= u <= 1:
+            dot = vel[0] * nx + vel[1] * ny
+            vel = [(vel[0] - 2 * dot * nx) * BOUNCE, (vel[1] - 2 * dot * ny) * BOUNCE]
+            return [pos[0] + px * s, pos[1] + py * s], vel
+    return new_pos, vel
+
+
+def swept_step(polygon, pos, vel, omega, dt):
+    pos, vel, _ = polygon.sweep_circle(pos, vel, BALL_RADIUS, omega, dt, BOUNCE)
+    return pos, vel
+
+
+METHODS = {
+    'discrete': discrete_step,
+    'centre-path': centre_path_step,
+    'swept': swept_step,
+}
+
+
+def run(method, timestep, rotation_speed, balls, steps, seed):
+    # Returns the fraction of balls whose centre ended up outside the hexagon
+    # at any point, the deepest any ball overlapped a wall after a step
+    # (before escaping), and the mean time per ball step. Nothing moves the
+    # balls back inside afterwards, so both measure the method itself.
+    rng = random.Random(seed)
+    omega = math.radians(rotation_speed)
+    escaped = 0
+    overlap = 0.0
+    elapsed = 0.0
+    for _ in range(balls):
+        polygon = RotatingPolygon((0, 0), HEX_RADIUS, angle=rng.uniform(0, 2 * math.pi))
+        spread = polygon.apothem - BALL_RADIUS
+        pos = [rng.uniform(-spread, spread) * 0.7, rng.uniform(-spread, spread) * 0.7]
+        heading = rng.uniform(0, 2 * math.pi)
+        speed = rng.uniform(0, MAX_SPEED)
+        vel = [speed * math.cos(heading), speed * math.sin(heading)]
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            vel[1] += GRAVITY * timestep
+            pos, vel = method(polygon, pos, vel, omega, timestep)
+            if min(polygon.gaps(pos, 0)) < -ESCAPE_MARGIN:
+                escaped += 1
+                break
+            overlap = max(overlap, -min(polygon.gaps(pos, BALL_RADIUS)))
+        elapsed += time.perf_counter() - start
+    return escaped / balls, overlap, elapsed / (balls * steps)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Count balls escaping a spinning hexagon under large timesteps')
+    parser.add_argument('--balls', type=int, default=200, help='Balls per case (default: 200)')
+    parser.add_argument('--steps', type=int, default=300,
+                        help='Physics steps per ball (default: 300)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'timestep':>8} {'spin':>6} {'method':>12} {'escaped':>8} {'overlap':>8} "
+          f"{'us/step':>8}")
+    for timestep in TIMESTEPS:
+        for rotation_speed in ROTATION_SPEEDS:
+            for name, method in METHODS.items():
+                escaped, overlap, seconds = run(method, timestep, rotation_speed,
+                                                args.balls, args.steps, args.seed)
+                print(f"{timestep:>8} {rotation_speed:>6g} {name:>12} {escaped:>8.1%} "
+                      f"{overlap:>8.3f} {seconds * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import pygame
+
+try:
+    import cv2
+except ImportError:  # Only needed when exporting
+    cv2 = None
+
+
+def use_dummy_display():
+    """Render without opening a window; call before pygame.init()."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+
+class ExportClock:
+    """
+    Stands in for pygame.time.Clock during an export.
+
+    tick() never waits and always reports exactly one frame at "fps", so
+    the game advances by video time rather than wall-clock time however
+    fast the frames are rendered. get_ticks() is the matching replacement
+    for pygame.time.get_ticks().
+    """
+
+    def __init__(self, fps):
+        self.frame_ms = 1000 / fps
+        self.ticks = 0.0
+
+    def tick(self, framerate=0):
+        self.ticks += self.frame_ms
+        return self.frame_ms
+
+    def get_ticks(self):
+        return self.ticks
+
+
+class VideoExporter:
+    """
+    Encodes pygame frames to a video file on a background thread.
+
+    write() copies the surface out once with pygame.image.tobytes and wraps
+    the bytes in an array without copying again; colour conversion and
+    encoding happen on the encoder thread, where OpenCV releases the GIL,
+    so they overlap with rendering the next frames. The queue between the
+    two is bounded: if the encoder falls behind, write() waits instead of
+    holding the whole clip in memory.
+    """
+
+    def __init__(self, path, size, fps, duration=None, codec='mp4v', queue_size=32):
+        if cv2 is None:
+            raise RuntimeError("video export needs OpenCV (pip install opencv-python)")
+        self.path = path
+        self.size = tuple(size)
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec), fps, self.size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"could not open {path} for writing with codec {codec!r}")
+        self.fps = fps
+        self.total = None if duration is None else round(duration * fps)
+        self.frames = 0
+        self.error = None
+        self.started = time.perf_counter()
+
+        self.queue = queue.Queue(queue_size)
+        self.thread = threading.Thread(target=self._encode, daemon=True)
+        self.thread.start()
+
+    @property
+    def done(self):
+        """True once "duration" seconds of frames have been written."""
+        return self.total is not None and self.frames >= self.total
+
+    def write(self, surface):
+        if self.error is not None:
+            raise self.error
+        width, height = self.size
+        frame = np.frombuffer(pygame.image.tobytes(surface, 'RGB'), np.uint8)
+        self.queue.put(frame.reshape(height, width, 3))
+        self.frames += 1
+
+    def _encode(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                return
+            if self.error is None:
+                # Keep draining after a failure so write() never blocks on it
+                try:
+                    self.writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+                except cv2.error as error:
+                    self.error = error
+
+    def close(self):
+        """Wait for the queued frames to be encoded and finish the file."""
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.release()
+        elapsed = time.perf_counter() - self.started
+        seconds = self.frames / self.fps
+        print(f"Exported {self.frames} frames ({seconds:.1f}s of video) to {self.path} "
+              f"in {elapsed:.1f}s ({seconds / elapsed:.1f}x real time)", file=sys.stderr)
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,9 +1,54 @@
 import pygame
 from pygame.locals import *
+import argparse
 import random
 import math
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "ball-bouncing",
+    ),
+)
+from frame_profiler import FrameProfiler
+from starfield import Starfield
+from video_export import ExportClock, VideoExporter, use_dummy_display
+
+parser = argparse.ArgumentParser(description="Flappy Snake - Space Adventure")
+parser.add_argument(
+    "--autopilot",
+    action="store_true",
+    help="Let the computer fly the ship and restart after each game",
+)
+parser.add_argument(
+    "--export",
+    metavar="PATH",
+    help="Play on autopilot offscreen as fast as possible and write a video to PATH",
+)
+parser.add_argument(
+    "--duration",
+    type=float,
+    default=60,
+    help="Length of the exported video in seconds (default: 60)",
+)
+parser.add_argument(
+    "--profile", action="store_true", help="Show per-phase frame timings (p50/p99) on screen"
+)
+parser.add_argument(
+    "--profile-output",
+    metavar="PATH",
+    help="Write per-frame phase timings to PATH (.csv or .json)",
+)
+args = parser.parse_args()
+autopilot = args.autopilot or args.export is not None
+profiler = FrameProfiler(args.profile, args.profile_output)
 
 # Initialize Pygame
+if args.export:
+    use_dummy_display()
 pygame.init()
 
 # Set up the display
@@ -11,8 +56,14 @@ width, height = 800, 600
 screen = pygame.display.set_mode((width, height))
 pygame.display.set_caption("Flappy Snake - Space Adventure")
 
-# Set up the clock for controlling frame rate
-clock = pygame.time.Clock()
+# Set up the clock for controlling frame rate; an export renders frames
+# back to back instead
+exporter = None
+if args.export:
+    clock = ExportClock(60)
+    exporter = VideoExporter(args.export, (width, height), 60, args.duration)
+else:
+    clock = pygame.time.Clock()
 
 # Define colors
 BLACK = (0, 0, 0)  # Background
@@ -44,13 +95,17 @@ score = 0
 ticks = 0
 state = STATE_START
 
+# Frames the autopilot waits on the start and game over screens
+AUTOPILOT_DELAY = 60
+autopilot_wait = 0
+
 # Background scrolling
 bg_x = 0
 bg_speed = 1
-stars = [
-    (random.uniform(0, width), random.uniform(0, height), random.uniform(1, 2))
-    for _ in range(200)
-]
+stars = [(random.uniform(0, width), random.uniform(0, height)) for _ in range(200)]
+starfield = Starfield(
+    [x for x, _ in stars], [y for _, y in stars], radius=1, wrap_width=width
+)
 
 
 # Function to reset game variables
@@ -81,10 +136,37 @@ def is_position_safe(x, y, obstacles):
     return True
 
 
+# Autopilot: a flap lifts the ship about 100 pixels, so flap once it is
+# falling through the lower part of the next gap (or of the screen when
+# there is none) to keep it bobbing inside the gap
+def autopilot_flap():
+    ahead = [obs for obs in obstacles if obs[0] + 50 > 90]
+    target = min(ahead)[1] if ahead else height / 2
+    return y_velocity >= 0 and head_y + y_velocity > target + 50
+
+
+# Function to show the finished frame, export it and wait for the next one
+def end_frame():
+    profiler.draw(screen)
+    pygame.display.flip()
+    profiler.mark("render")
+    profiler.end_frame()
+    if exporter is not None:
+        exporter.write(screen)
+        if exporter.done:
+            exporter.close()
+            profiler.close()
+            pygame.quit()
+            exit()
+    clock.tick(60)
+
+
 # Main game loop
 while True:
+    profiler.begin_frame()
     for event in pygame.event.get():
         if event.type == QUIT:
+            profiler.close()
             pygame.quit()
             exit()
         if event.type == KEYDOWN:
@@ -95,18 +177,28 @@ while True:
             elif state == STATE_GAME_OVER and event.key == K_SPACE:
                 reset_game()
             elif state == STATE_GAME_OVER and event.key == K_q:
+                profiler.close()
                 pygame.quit()
                 exit()
 
+    if autopilot:
+        if state == STATE_PLAYING:
+            if autopilot_flap():
+                y_velocity = flap_strength
+        else:
+            autopilot_wait += 1
+            if autopilot_wait >= AUTOPILOT_DELAY:
+                autopilot_wait = 0
+                reset_game()
+    profiler.mark("events")
+
     if state == STATE_START:
         # Render start screen
         screen.fill(BLACK)
         bg_x -= bg_speed
         if bg_x <= -width:
             bg_x += width
-        for star in stars:
-            star_x = (star[0] - bg_x) % width
-            pygame.draw.circle(screen, WHITE, (int(star_x), int(star[1])), int(star[2]))
+        starfield.draw(screen, scroll=bg_x)
 
         # Centered title
         font = pygame.font.SysFont("Arial", 36)  # Reduced from 48
@@ -126,8 +218,7 @@ while True:
         y = height / 2 + 50
         screen.blit(text, (x, y))
 
-        pygame.display.flip()
-        clock.tick(60)
+        end_frame()
         continue
 
     elif state == STATE_PLAYING:
@@ -173,6 +264,7 @@ while True:
             p[1] += p[3]
             p[4] -= 1
         particles = [p for p in particles if p[4] > 0]
+        profiler.mark("physics")
 
         # Collision with food
         head_rect = pygame.Rect(100 - 10, head_y - 10, 20, 20)
@@ -195,15 +287,14 @@ while True:
             )
             if head_rect.colliderect(upper_rect) or head_rect.colliderect(lower_rect):
                 state = STATE_GAME_OVER
+        profiler.mark("collision")
 
         # Rendering
         screen.fill(BLACK)
         bg_x -= bg_speed
         if bg_x <= -width:
             bg_x += width
-        for star in stars:
-            star_x = (star[0] - bg_x) % width
-            pygame.draw.circle(screen, WHITE, (int(star_x), int(star[1])), int(star[2]))
+        starfield.draw(screen, scroll=bg_x)
 
         # Draw asteroid obstacles
         for obs in obstacles:
@@ -251,8 +342,7 @@ while True:
         text = font.render(f"Score: {score}", True, WHITE)
         screen.blit(text, (10, 10))
 
-        pygame.display.flip()
-        clock.tick(60)
+        end_frame()
 
     elif state == STATE_GAME_OVER:
         # Render game over screen
@@ -260,9 +350,7 @@ while True:
         bg_x -= bg_speed
         if bg_x <= -width:
             bg_x += width
-        for star in stars:
-            star_x = (star[0] - bg_x) % width
-            pygame.draw.circle(screen, WHITE, (int(star_x), int(star[1])), int(star[2]))
+        starfield.draw(screen, scroll=bg_x)
 
         # Centered "Game Over"
         font = pygame.font.SysFont("Arial", 72)
@@ -290,7 +378,6 @@ while True:
         y = height / 2 + 50
         screen.blit(text, (x, y))
 
-        pygame.display.flip()
-        clock.tick(60)
+        end_frame()
 
 pygame.quit()
@@ -0,0 +1,201 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import cv2
+import numpy as np
+
+import rotate_image
+
+# Default sweep; every combination is one benchmark case
+RESOLUTIONS = ['640x360', '1920x1080']
+CHANNELS = [3, 4]
+INTERPOLATIONS = ['nearest', 'linear', 'cubic']
+FPS_VALUES = [30]
+ENCODERS = ['opencv', 'y4m']
+# affine warps every frame with warpAffine; remap replays precomputed tables,
+# as when many same-size clips share one RemapCache
+WARPS = ['affine', 'remap']
+
+# Metrics compared against a baseline, and which direction is worse
+HIGHER_IS_BETTER = {'frames_per_sec': True, 'peak_rss_bytes': False}
+
+def make_test_image(width, height, channels, seed=0):
+    # Smooth gradients plus noise, so PNG decode cost resembles real artwork
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    planes = [(x * 255 // max(width - 1, 1)), (y * 255 // max(height - 1, 1)),
+              ((x + y) * 255 // max(width + height - 2, 1))]
+    if channels == 4:
+        # Radial alpha fade so every alpha level is composited
+        radius = np.hypot(x - width / 2, y - height / 2) / np.hypot(width / 2, height / 2)
+        planes.append(255 * (1 - radius))
+    image = np.stack(planes, axis=-1).astype(np.int16)
+    image += rng.integers(-8, 9, image.shape, dtype=np.int16)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+def case_key(case):
+    key = (f"{case['resolution']}/{case['channels']}ch/{case['interpolation']}/"
+           f"{case['fps']:g}fps/{case['encoder']}")
+    if case['warp'] != 'affine':
+        key += f"/{case['warp']}"
+    return key
+
+def write_test_image(case, path):
+    width, height = (int(n) for n in case['resolution'].split('x'))
+    cv2.imwrite(path, make_test_image(width, height, case['channels']))
+
+def run_case(case, frames, image_path):
+    with open(image_path, 'rb') as f:
+        data = f.read()
+
+    start = time.perf_counter()
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+    decode = time.perf_counter() - start
+
+    composite = 0.0
+    composite_peak = 0
+    if image.shape[-1] == 4:
+        tracemalloc.start()
+        start = time.perf_counter()
+        image = rotate_image.composite_on_black(image)
+        composite = time.perf_counter() - start
+        composite_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    duration = frames / case['fps']
+    interpolation = rotate_image.INTERPOLATIONS[case['interpolation']]
+    remap_cache = None
+    remap_build = 0.0
+    if case['warp'] == 'remap':
+        # Build the tables up front, as an earlier job of the same size would have
+        remap_cache = rotate_image.RemapCache(image.shape[0] * image.shape[1] * 6 * (frames + 1))
+        start = time.perf_counter()
+        for angle in rotate_image.rotation_angles(duration, case['fps']):
+            remap_cache.maps(image.shape[1], image.shape[0], angle, interpolation)
+        remap_build = time.perf_counter() - start
+
+    extension = rotate_image.ENCODER_EXTENSIONS[case['encoder']]
+    with tempfile.TemporaryDirectory() as output_dir:
+        timings = rotate_image.write_rotating_video(
+            image, os.path.join(output_dir, 'output' + extension),
+            duration=duration, fps=case['fps'], encoder=case['encoder'],
+            interpolation=interpolation, remap_cache=remap_cache)
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak_rss *= 1024
+
+    return dict(case, key=case_key(case), frames=frames,
+                frames_per_sec=frames / timings['total'],
+                stage_ms={
+                    'decode': decode * 1000,
+                    'composite': composite * 1000,
+                    'warp': timings['warp'] * 1000 / frames,
+                    'encode': timings['encode'] * 1000 / frames,
+                    'remap_build': remap_build * 1000 / frames,
+                },
+                composite_peak_bytes=composite_peak,
+                peak_rss_bytes=peak_rss)
+
+def run_benchmarks(cases, frames):
+    # Each case runs in a fresh process so peak RSS is not inherited from
+    # earlier, larger cases. Test images are handed over as PNG files, so
+    # the case's peak RSS is the pipeline's and not that of make_test_image's
+    # full-size int64 and float64 scratch arrays. They are generated in a
+    # process of their own as well: on Linux a child starts from its parent's
+    # peak RSS, so generating them here would raise every case's figure.
+    results = []
+    context = get_context('spawn')
+    with tempfile.TemporaryDirectory() as image_dir:
+        for case in cases:
+            image_path = os.path.join(image_dir, f"{case['resolution']}_{case['channels']}ch.png")
+            if not os.path.exists(image_path):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    pool.submit(write_test_image, case, image_path).result()
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, case, frames, image_path).result()
+            print(f"{result['key']}: {result['frames_per_sec']:.1f} frames/s, "
+                  f"warp {result['stage_ms']['warp']:.2f} ms, "
+                  f"encode {result['stage_ms']['encode']:.2f} ms, "
+                  f"peak RSS {result['peak_rss_bytes'] / 2 ** 20:.0f} MiB", file=sys.stderr)
+            results.append(result)
+    return results
+
+def find_regressions(results, baseline, tolerance):
+    previous = {result['key']: result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get(result['key'])
+        if before is None:
+            continue
+        for metric, higher_is_better in HIGHER_IS_BETTER.items():
+            change = (result[metric] - before[metric]) / before[metric]
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{result['key']}: {metric} {before[metric]:.4g} -> "
+                                   f"{result[metric]:.4g} ({change:+.1%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the image rotation pipeline')
+    parser.add_argument('--resolutions', nargs='+', default=RESOLUTIONS,
+                        help='Input sizes as WIDTHxHEIGHT')
+    parser.add_argument('--channels', nargs='+', type=int, choices=[3, 4], default=CHANNELS)
+    parser.add_argument('--interpolations', nargs='+', choices=sorted(rotate_image.INTERPOLATIONS),
+                        default=INTERPOLATIONS)
+    parser.add_argument('--fps', nargs='+', type=float, default=FPS_VALUES)
+    parser.add_argument('--encoders', nargs='+', choices=sorted(rotate_image.ENCODERS),
+                        default=ENCODERS)
+    parser.add_argument('--warps', nargs='+', choices=WARPS, default=WARPS)
+    parser.add_argument('--frames', type=int, default=60,
+                        help='Frames rendered per case (default: 60)')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative slowdown or memory growth (default: 0.15)')
+    args = parser.parse_args()
+
+    cases = [dict(resolution=resolution, channels=channels, interpolation=interpolation,
+                  fps=fps, encoder=encoder, warp=warp)
+             for resolution, channels, interpolation, fps, encoder, warp in itertools.product(
+                 args.resolutions, args.channels, args.interpolations, args.fps, args.encoders,
+                 args.warps)]
+    report = {
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': run_benchmarks(cases, args.frames),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report['results'], baseline, args.tolerance)
+        if regressions:
+            print('Regressions against baseline:', file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print('No regressions against baseline', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
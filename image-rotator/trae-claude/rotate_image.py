@@ -1,10 +1,58 @@
 import cv2
 import numpy as np
 import argparse
+import hashlib
+import io
+import json
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
 
-def rotate_image(image, angle):
+# Angle schedules mapping normalized time t in [0, 1] to degrees
+CURVES = {
+    # Accelerating 6 full rotations with steeper curve
+    'exponential': lambda t: 2160 * (np.exp(4 * t) - 1) / (np.exp(4) - 1),
+    # Constant speed 6 full rotations
+    'linear': lambda t: 2160 * t,
+}
+
+INTERPOLATIONS = {
+    'nearest': cv2.INTER_NEAREST,
+    'linear': cv2.INTER_LINEAR,
+    'cubic': cv2.INTER_CUBIC,
+}
+
+# Preview renders trade quality for speed while iterating on curves
+PREVIEW_FPS = 12
+PREVIEW_MAX_SIZE = 480
+
+BATCH_CACHE_FILE = '.rotate_cache.json'
+
+FFMPEG_BINARY = 'ffmpeg'
+
+# Alpha compositing onto black as a lookup table indexed by (alpha << 8) | channel.
+# It is built from the same float expression it replaces, so the integer path
+# matches the float64 output bit for bit.
+_ALPHA = np.arange(256)[:, np.newaxis] / 255.0
+COMPOSITE_LUT = (_ALPHA * np.arange(256) + (1 - _ALPHA) * 0).astype(np.uint8).ravel()
+
+# Pixels composited per row band, bounding the uint16/index temporaries
+COMPOSITE_BAND_PIXELS = 1 << 20
+
+def rotate_image(image, angle, interpolation=cv2.INTER_LINEAR, remap_cache=None):
     # Get image dimensions
     height, width = image.shape[:2]
+    if remap_cache is not None:
+        map1, map2 = remap_cache.maps(width, height, angle, interpolation)
+        return cv2.remap(image, map1, map2, interpolation, borderMode=cv2.BORDER_CONSTANT,
+                         borderValue=(0, 0, 0))
     # Calculate the center of rotation
     center = (width // 2, height // 2)
     
@@ -13,61 +61,724 @@ def rotate_image(image, angle):
     
     # Perform rotation while maintaining original dimensions
     rotated = cv2.warpAffine(image, rotation_matrix, (width, height),
-                            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+                            flags=interpolation, borderMode=cv2.BORDER_CONSTANT,
                             borderValue=(0, 0, 0))  # Black background
     return rotated
 
-def create_rotating_video(input_image_path, output_video_path, duration=10, fps=30):
-    # Read the input image
-    image = cv2.imread(input_image_path, cv2.IMREAD_UNCHANGED)
+def rotation_maps(width, height, angle, interpolation=cv2.INTER_LINEAR):
+    # The warpAffine in rotate_image as a fixed-point remap table pair: map1
+    # holds integer source coordinates (CV_16SC2) and map2 the 1/32 pixel
+    # interpolation index (None for nearest-neighbour). Quantizing to 1/32
+    # pixel can shift interpolated values by a few levels at sharp edges.
+    center = (width // 2, height // 2)
+    rotation_matrix = cv2.getRotationMatrix2D(center, -angle, 1.0)
+    inverse = cv2.invertAffineTransform(rotation_matrix).astype(np.float32)
+    xs = np.arange(width, dtype=np.float32)
+    ys = np.arange(height, dtype=np.float32)[:, np.newaxis]
+    map_x = inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]
+    map_y = inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]
+    map1, map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2,
+                                 nninterpolation=interpolation == cv2.INTER_NEAREST)
+    return map1, map2 if map2 is not None and map2.size else None
+
+class RemapCache:
+    # LRU cache of rotation_maps keyed by frame size, angle and whether the
+    # maps carry an interpolation table. Every job that renders the same size
+    # and angle schedule reuses the tables, skipping the per-frame affine
+    # setup. With a directory, tables are also stored as .npz files so later
+    # processes can load instead of rebuild; the oldest files are pruned to
+    # keep the directory under max_bytes as well. Each write goes through its
+    # own .tmp file, which the prune skips, and files another thread or
+    # process removed first are ignored, so jobs can share the directory.
+    def __init__(self, max_bytes, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.maps_by_key = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.prune_lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def maps(self, width, height, angle, interpolation=cv2.INTER_LINEAR):
+        nearest = interpolation == cv2.INTER_NEAREST
+        key = (width, height, round(float(angle), 6), nearest)
+        with self.lock:
+            maps = self.maps_by_key.get(key)
+            if maps is not None:
+                self.maps_by_key.move_to_end(key)
+                self.hits += 1
+                return maps
+            self.misses += 1
+
+        maps = self.load(key)
+        if maps is None:
+            maps = rotation_maps(width, height, angle, interpolation)
+            self.store(key, maps)
+        nbytes = sum(m.nbytes for m in maps if m is not None)
+        if nbytes > self.max_bytes:
+            return maps
+        with self.lock:
+            if key not in self.maps_by_key:
+                self.maps_by_key[key] = maps
+                self.size += nbytes
+                while self.size > self.max_bytes:
+                    _, evicted = self.maps_by_key.popitem(last=False)
+                    self.size -= sum(m.nbytes for m in evicted if m is not None)
+        return maps
+
+    def path(self, key):
+        width, height, angle, nearest = key
+        kind = 'nearest' if nearest else 'interp'
+        return os.path.join(self.directory, f'{width}x{height}_{angle:.6f}_{kind}.npz')
+
+    def load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with np.load(self.path(key)) as stored:
+                return stored['map1'], stored['map2'] if 'map2' in stored else None
+        except FileNotFoundError:
+            return None
+
+    def store(self, key, maps):
+        if self.directory is None:
+            return
+        map1, map2 = maps
+        arrays = {'map1': map1} if map2 is None else {'map1': map1, 'map2': map2}
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, self.path(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        with self.prune_lock:
+            self.prune()
+
+    def prune(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.npz'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+class FrameCache:
+    # LRU cache of rotated frames keyed by angle % 360 quantized to a tolerance
+    # in degrees. Frames are rendered at the quantized angle, so a cached frame
+    # is identical no matter which schedule angle first produced it. With no
+    # tolerance given, it defaults to the angle that moves the image corner by
+    # half a pixel.
+    def __init__(self, max_bytes, tolerance=None):
+        if tolerance is not None and not 0 < tolerance <= 360:
+            raise ValueError(f"Cache tolerance must be in (0, 360] degrees, got {tolerance}")
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        self.frames = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def rotate(self, image, angle, interpolation=cv2.INTER_LINEAR, remap_cache=None):
+        if self.tolerance is None:
+            half_diagonal = np.hypot(image.shape[0], image.shape[1]) / 2
+            self.tolerance = np.degrees(0.5 / max(half_diagonal, 1.0))
+        steps = round(360 / self.tolerance)
+        key = round((angle % 360) / 360 * steps) % steps
+
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+                self.hits += 1
+                return frame
+            self.misses += 1
+
+        frame = rotate_image(image, key * 360 / steps, interpolation, remap_cache)
+        if frame.nbytes > self.max_bytes:
+            return frame
+        with self.lock:
+            if key not in self.frames:
+                self.frames[key] = frame
+                self.size += frame.nbytes
+                while self.size > self.max_bytes:
+                    _, evicted = self.frames.popitem(last=False)
+                    self.size -= evicted.nbytes
+        return frame
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+def rotate_chunk(image, angles, cache=None, interpolation=cv2.INTER_LINEAR, remap_cache=None):
+    if cache is not None:
+        return [cache.rotate(image, angle, interpolation, remap_cache) for angle in angles]
+    return [rotate_image(image, angle, interpolation, remap_cache) for angle in angles]
+
+def render_frames(image, angles, workers=1, chunk_size=8, pool=None, cache=None,
+                  interpolation=cv2.INTER_LINEAR, remap_cache=None):
+    # Serial path: one warp per frame on the calling thread
+    if workers <= 1:
+        for angle in angles:
+            if cache is None:
+                yield rotate_image(image, angle, interpolation, remap_cache)
+            else:
+                yield cache.rotate(image, angle, interpolation, remap_cache)
+        return
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from render_frames(image, angles, workers, chunk_size, pool, cache,
+                                     interpolation, remap_cache)
+        return
+
+    # cv2.warpAffine releases the GIL, so a thread pool scales across cores
+    # without pickling the source image for every task. Chunks are submitted
+    # in order and at most max_pending of them are in flight, so the reorder
+    # buffer holds a bounded number of frames regardless of clip length.
+    max_pending = workers * 2
+    pending = deque()
+    for start in range(0, len(angles), chunk_size):
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+        pending.append(pool.submit(rotate_chunk, image, angles[start:start + chunk_size], cache,
+                                   interpolation, remap_cache))
+    while pending:
+        yield from pending.popleft().result()
+
+def timed_frames(frames, timings, stage):
+    # Accumulate the time spent producing each frame under timings[stage]
+    frames = iter(frames)
+    while True:
+        start = time.perf_counter()
+        frame = next(frames, None)
+        timings[stage] += time.perf_counter() - start
+        if frame is None:
+            return
+        yield frame
+
+def pipeline_frames(frames, timings, queue_size=16):
+    # Render frames on a producer thread while the caller encodes them.
+    # OpenCV releases the GIL in both warpAffine and VideoWriter.write, so the
+    # two stages overlap; the bounded queue keeps at most queue_size frames
+    # buffered. timings['wait'] is how long the consumer sat on an empty queue,
+    # i.e. how much the warp side is holding the encoder back.
+    frame_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    done = object()
+
+    def produce():
+        try:
+            for frame in timed_frames(frames, timings, 'warp'):
+                while not stop.is_set():
+                    try:
+                        frame_queue.put(frame, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set():
+                    return
+        except BaseException as error:
+            errors.append(error)
+        finally:
+            frame_queue.put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            frame = frame_queue.get()
+            timings['wait'] += time.perf_counter() - start
+            if frame is done:
+                break
+            yield frame
+    finally:
+        stop.set()
+        # Drain so a producer blocked on a full queue can reach its sentinel
+        while producer.is_alive():
+            try:
+                frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+    if errors:
+        raise errors[0]
+
+def decode_image(data, source='<bytes>'):
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
     
     if image is None:
-        raise ValueError(f"Could not read image from {input_image_path}")
+        raise ValueError(f"Could not read image from {source}")
     
     # If image has an alpha channel, convert it to RGB with black background
-    if image.shape[-1] == 4:
-        alpha = image[:, :, 3] / 255.0
-        image_rgb = image[:, :, :3]
-        black_background = np.zeros_like(image_rgb)
-        image = (alpha[:, :, np.newaxis] * image_rgb + 
-                (1 - alpha[:, :, np.newaxis]) * black_background).astype(np.uint8)
-    
-    # Calculate total frames
-    total_frames = int(duration * fps)
-    
-    # Create video writer with H.264 codec
-    fourcc = cv2.VideoWriter_fourcc(*'avc1')
-    video = cv2.VideoWriter(output_video_path, fourcc, fps, 
-                           (image.shape[1], image.shape[0]))
+    if image.ndim == 3 and image.shape[-1] == 4:
+        image = composite_on_black(image)
+    return image
+
+def composite_on_black(image):
+    # Premultiply BGR by alpha through COMPOSITE_LUT one band of rows at a time,
+    # so no full-size float64 arrays are created for large RGBA inputs
+    height, width = image.shape[:2]
+    result = np.empty((height, width, 3), np.uint8)
+    band_rows = max(1, COMPOSITE_BAND_PIXELS // width)
+    for top in range(0, height, band_rows):
+        band = image[top:top + band_rows]
+        index = band[:, :, 3:4].astype(np.uint16)
+        index <<= 8
+        index = index | band[:, :, :3]
+        np.take(COMPOSITE_LUT, index, out=result[top:top + band_rows])
+    return result
+
+def resize_image(image, scale=1.0, max_size=None):
+    # Downsample once with an area filter, before any per-frame work. max_size
+    # caps the longer side; the image is never upscaled.
+    height, width = image.shape[:2]
+    if max_size is not None:
+        scale = min(scale, max_size / max(height, width))
+    if scale >= 1.0:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+def open_video_writer(output_video_path, fps, size, codec='avc1'):
+    # Create video writer with the requested codec (H.264 by default)
+    fourcc = cv2.VideoWriter_fourcc(*codec)
+    video = cv2.VideoWriter(output_video_path, fourcc, fps, size)
     
     if not video.isOpened():
-        # Fallback to MP4V codec if H.264 is not available
+        # Fallback to MP4V codec if the requested one is not available
         video.release()
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video = cv2.VideoWriter(output_video_path, fourcc, fps,
-                               (image.shape[1], image.shape[0]))
-    
-    # Create accelerating rotation
-    # Use exponential function for acceleration with higher exponent for faster acceleration
-    t = np.linspace(0, 1, total_frames)
-    angles = 2160 * (np.exp(4 * t) - 1) / (np.exp(4) - 1)  # Accelerating 6 full rotations with steeper curve
+        video = cv2.VideoWriter(output_video_path, fourcc, fps, size)
+    return video
+
+class FFmpegWriter:
+    # Minimal cv2.VideoWriter look-alike that pipes raw BGR frames into an
+    # ffmpeg process. The output is either a file path or a writable file
+    # object (BytesIO, pipe, socket file); for file objects ffmpeg emits
+    # fragmented MP4 on stdout, which a reader thread copies into the sink.
+    def __init__(self, output, fps, size, codec='libx264', preset=None, threads=None,
+                 pix_fmt='yuv420p'):
+        width, height = size
+        command = [FFMPEG_BINARY, '-loglevel', 'error', '-y',
+                   '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+                   '-r', str(fps), '-i', 'pipe:0']
+        if (width % 2 or height % 2) and any(tag in pix_fmt for tag in ('420', '422', 'nv')):
+            # Chroma-subsampled formats need even dimensions; pad the odd
+            # edge with one black row or column
+            command += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+        command += ['-c:v', codec, '-pix_fmt', pix_fmt]
+        if preset is not None:
+            command += ['-preset', preset]
+        if threads is not None:
+            command += ['-threads', str(threads)]
+        to_file = isinstance(output, (str, os.PathLike))
+        if to_file:
+            command.append(os.fspath(output))
+        else:
+            command += ['-f', 'mp4', '-movflags', 'frag_keyframe+empty_moov', 'pipe:1']
+
+        self.errors = tempfile.TemporaryFile()
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                            stdout=subprocess.DEVNULL if to_file else subprocess.PIPE,
+                                            stderr=self.errors)
+        except FileNotFoundError:
+            self.errors.close()
+            raise RuntimeError(f"Could not run {FFMPEG_BINARY}; is ffmpeg installed?") from None
+
+        self.reader = None
+        if not to_file:
+            self.reader = threading.Thread(target=shutil.copyfileobj,
+                                           args=(self.process.stdout, output), daemon=True)
+            self.reader.start()
+
+    def isOpened(self):
+        return self.process.poll() is None
+
+    def write(self, frame):
+        # Hand ffmpeg the frame's own buffer instead of a bytes copy
+        self.process.stdin.write(np.ascontiguousarray(frame).data)
+
+    def release(self):
+        if self.process.stdin.closed:
+            return
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+        if self.reader is not None:
+            self.reader.join()
+        self.errors.seek(0)
+        message = self.errors.read().decode(errors='replace').strip()
+        self.errors.close()
+        if self.process.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}: {message}")
+
+class PNGSequenceWriter:
+    # Writes each frame as a numbered PNG into an output directory
+    def __init__(self, output, fps, size, compression=3):
+        self.output = os.fspath(output)
+        self.params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+        self.count = 0
+        os.makedirs(self.output, exist_ok=True)
+
+    def isOpened(self):
+        return True
+
+    def write(self, frame):
+        path = os.path.join(self.output, f'frame_{self.count:06d}.png')
+        if not cv2.imwrite(path, frame, self.params):
+            raise RuntimeError(f"Could not write {path}")
+        self.count += 1
+
+    def release(self):
+        pass
+
+# BGR to limited-range BT.601 YUV, the conversion COLOR_BGR2YUV_I420 uses;
+# COLOR_BGR2YUV is full range, which Y4M readers would misread
+BGR2YUV_LIMITED = np.array([
+    [0.097906, 0.504129, 0.256788, 16],
+    [0.439216, -0.290993, -0.148223, 128],
+    [-0.071427, -0.367788, 0.439216, 128],
+])
+
+class Y4MWriter:
+    # Writes uncompressed YUV4MPEG2, which any encoder can read back in.
+    # Even-sized frames are stored as 4:2:0, odd-sized ones as 4:4:4; both
+    # are limited-range BT.601, the range readers assume.
+    def __init__(self, output, fps, size):
+        width, height = size
+        self.subsampled = width % 2 == 0 and height % 2 == 0
+        rate = Fraction(fps).limit_denominator(1001)
+        colorspace = 'C420jpeg' if self.subsampled else 'C444'
+        self.owns_file = isinstance(output, (str, os.PathLike))
+        self.file = open(output, 'wb') if self.owns_file else output
+        self.file.write(f'YUV4MPEG2 W{width} H{height} F{rate.numerator}:{rate.denominator} '
+                        f'Ip A1:1 {colorspace}\n'.encode())
+
+    def isOpened(self):
+        return not self.file.closed
+
+    def write(self, frame):
+        if self.subsampled:
+            planes = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+        else:
+            yuv = cv2.transform(frame, BGR2YUV_LIMITED)
+            planes = np.ascontiguousarray(yuv.transpose(2, 0, 1))
+        self.file.write(b'FRAME\n')
+        self.file.write(planes.data)
+
+    def release(self):
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+# Encoder backends: each is called as backend(output, fps, (width, height), **options)
+# and returns an object with the cv2.VideoWriter write/release/isOpened methods
+ENCODERS = {
+    'opencv': open_video_writer,
+    'ffmpeg': FFmpegWriter,
+    'png': PNGSequenceWriter,
+    'y4m': Y4MWriter,
+}
+
+# Options each backend understands, for validating user input
+ENCODER_OPTIONS = {
+    'opencv': {'codec'},
+    'ffmpeg': {'codec', 'preset', 'threads', 'pix_fmt'},
+    'png': {'compression'},
+    'y4m': set(),
+}
+
+# File extension of the output for each backend; png writes a directory
+ENCODER_EXTENSIONS = {'opencv': '.mp4', 'ffmpeg': '.mp4', 'png': '', 'y4m': '.y4m'}
+
+def open_encoder(encoder, output, fps, size, options=None):
+    options = options or {}
+    unsupported = set(options) - ENCODER_OPTIONS[encoder]
+    if unsupported:
+        raise ValueError(f"The {encoder} encoder does not support: {', '.join(sorted(unsupported))}")
+    return ENCODERS[encoder](output, fps, size, **options)
+
+def rotation_angles(duration=10, fps=30, curve='exponential'):
+    # Create the rotation schedule from the selected curve
+    t = np.linspace(0, 1, int(duration * fps))
+    return CURVES[curve](t)
+
+def iter_rotating_frames(image, duration=10, fps=30, curve='exponential', workers=1,
+                         frame_cache=None, interpolation=cv2.INTER_LINEAR, scale=1.0,
+                         max_size=None, remap_cache=None):
+    # Lazily yield the rotated frames for an in-memory BGR or BGRA image,
+    # without buffering the clip
+    if image.ndim == 3 and image.shape[-1] == 4:
+        image = composite_on_black(image)
+    image = resize_image(image, scale, max_size)
+    yield from render_frames(image, rotation_angles(duration, fps, curve), workers,
+                             cache=frame_cache, interpolation=interpolation,
+                             remap_cache=remap_cache)
+
+def encode_rotating_video(image, sink, duration=10, fps=30, encoder='ffmpeg', encoder_options=None,
+                          scale=1.0, max_size=None, **options):
+    # Encode the rotating clip into a writable file object (ffmpeg or y4m)
+    if image.ndim == 3 and image.shape[-1] == 4:
+        image = composite_on_black(image)
+    image = resize_image(image, scale, max_size)
+    writer = open_encoder(encoder, sink, fps, (image.shape[1], image.shape[0]), encoder_options)
+    try:
+        for frame in iter_rotating_frames(image, duration, fps, **options):
+            writer.write(frame)
+    finally:
+        writer.release()
+
+def rotating_video_bytes(image, duration=10, fps=30, **options):
+    # Render the rotating clip to MP4 bytes without touching the filesystem
+    buffer = io.BytesIO()
+    encode_rotating_video(image, buffer, duration, fps, **options)
+    return buffer.getvalue()
+
+def write_rotating_video(image, output_video_path, duration=10, fps=30, workers=1,
+                         pipeline=False, curve='exponential', encoder='opencv',
+                         encoder_options=None, pool=None, frame_cache=None,
+                         interpolation=cv2.INTER_LINEAR, scale=1.0, max_size=None,
+                         remap_cache=None):
+    start_time = time.perf_counter()
+    timings = {'warp': 0.0, 'encode': 0.0, 'wait': 0.0}
+    image = resize_image(image, scale, max_size)
+
+    video = open_encoder(encoder, output_video_path, fps, (image.shape[1], image.shape[0]),
+                         encoder_options)
+    angles = rotation_angles(duration, fps, curve)
     
     # Generate and write frames
-    for angle in angles:
-        rotated_frame = rotate_image(image, angle)
-        video.write(rotated_frame)
-    
-    # Release video writer
-    video.release()
+    frames = render_frames(image, angles, workers, pool=pool, cache=frame_cache,
+                           interpolation=interpolation, remap_cache=remap_cache)
+    if pipeline:
+        frames = pipeline_frames(frames, timings)
+    else:
+        frames = timed_frames(frames, timings, 'warp')
+    try:
+        for rotated_frame in frames:
+            start = time.perf_counter()
+            video.write(rotated_frame)
+            timings['encode'] += time.perf_counter() - start
+    finally:
+        # Release video writer; for ffmpeg this also reports why it failed
+        video.release()
+
+    timings['total'] = time.perf_counter() - start_time
+    return timings
+
+def create_rotating_video(input_image_path, output_video_path, duration=10, fps=30, **options):
+    # Read the input image
+    with open(input_image_path, 'rb') as f:
+        image = decode_image(f.read(), input_image_path)
+    return write_rotating_video(image, output_video_path, duration, fps, **options)
+
+def list_batch_inputs(source):
+    # A directory contributes its PNGs; any other file is a manifest with one
+    # image path per line, relative to the manifest
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source)
+                      if name.lower().endswith('.png'))
+    base = os.path.dirname(source)
+    with open(source) as f:
+        lines = (line.strip() for line in f)
+        return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+def render_hash(data, params):
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def save_batch_cache(cache_path, cache):
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(temp_path, cache_path)
+
+def create_rotating_videos(source, output_dir, duration=10, fps=30, workers=1, pipeline=False,
+                           curve='exponential', encoder='opencv', encoder_options=None,
+                           frame_cache_bytes=0, interpolation=cv2.INTER_LINEAR, scale=1.0,
+                           max_size=None, remap_cache=None,
+                           cache_tolerance=None):
+    # Render every image under source into output_dir, skipping outputs whose
+    # input bytes and parameters hash to a file that has already been rendered.
+    # The cache maps output file names to the hash they were rendered from.
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, BATCH_CACHE_FILE)
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+    params = {'duration': duration, 'fps': fps, 'curve': curve, 'encoder': encoder,
+              'encoder_options': encoder_options or {}, 'interpolation': interpolation,
+              'scale': scale, 'max_size': max_size,
+              # The frame cache renders at quantized angles, so it changes the
+              # output. A None tolerance is resolved from the image size,
+              # which the input bytes, scale and max_size already pin down.
+              'frame_cache': bool(frame_cache_bytes),
+              'cache_tolerance': cache_tolerance if frame_cache_bytes else None,
+              # Remap tables quantize to 1/32 pixel, which also shifts pixels
+              'remap': remap_cache is not None}
+    results = {'rendered': [], 'copied': [], 'skipped': []}
+
+    # Outputs are named after the input file alone, so two inputs with the
+    # same name would overwrite each other and keep replacing each other's
+    # cache entry
+    jobs = {}
+    for input_path in list_batch_inputs(source):
+        name = os.path.splitext(os.path.basename(input_path))[0] + ENCODER_EXTENSIONS[encoder]
+        if name in jobs:
+            raise ValueError(f"{jobs[name]} and {input_path} would both be written to {name}")
+        jobs[name] = input_path
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for name, input_path in jobs.items():
+            output_path = os.path.join(output_dir, name)
+            with open(input_path, 'rb') as f:
+                data = f.read()
+            key = render_hash(data, params)
+
+            if cache.get(name) == key and os.path.exists(output_path):
+                results['skipped'].append(output_path)
+                continue
+
+            # An identical input rendered under another name can just be copied
+            rendered = [other for other, other_key in cache.items()
+                        if other_key == key and os.path.exists(os.path.join(output_dir, other))]
+            if rendered:
+                source_path = os.path.join(output_dir, rendered[0])
+                if os.path.isdir(source_path):
+                    shutil.copytree(source_path, output_path, dirs_exist_ok=True)
+                else:
+                    shutil.copyfile(source_path, output_path)
+                results['copied'].append(output_path)
+            else:
+                frame_cache = (FrameCache(frame_cache_bytes, cache_tolerance)
+                               if frame_cache_bytes else None)
+                write_rotating_video(decode_image(data, input_path), output_path, duration, fps,
+                                     workers, pipeline, curve, encoder, encoder_options, pool,
+                                     frame_cache, interpolation, scale, max_size, remap_cache)
+                results['rendered'].append(output_path)
+
+            cache[name] = key
+            save_batch_cache(cache_path, cache)
+    return results
 
 def main():
     parser = argparse.ArgumentParser(description='Create a rotating video from an image')
-    parser.add_argument('input_image', help='Path to input PNG image')
-    parser.add_argument('output_video', help='Path to output video file')
+    parser.add_argument('input_image',
+                        help='Path to input PNG image (with --batch: a directory of PNGs or a manifest file)')
+    parser.add_argument('output_video',
+                        help='Path to output video file (with --batch: output directory)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Render many images, skipping outputs that are already up to date')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Video length in seconds (default: 10)')
+    parser.add_argument('--fps', type=float, default=30,
+                        help='Frames per second (default: 30)')
+    parser.add_argument('--curve', choices=sorted(CURVES), default='exponential',
+                        help='Rotation schedule (default: exponential)')
+    parser.add_argument('--encoder', choices=sorted(ENCODERS), default='opencv',
+                        help='Encoder backend; png writes a directory of frames (default: opencv)')
+    parser.add_argument('--codec',
+                        help='opencv: FourCC, falls back to mp4v (default: avc1); '
+                             'ffmpeg: codec name (default: libx264)')
+    parser.add_argument('--preset', help='ffmpeg encoder preset, e.g. ultrafast')
+    parser.add_argument('--threads', type=int, help='ffmpeg encoder thread count')
+    parser.add_argument('--pix-fmt', help='ffmpeg output pixel format (default: yuv420p)')
+    parser.add_argument('--interpolation', choices=sorted(INTERPOLATIONS), default='linear',
+                        help='Warp interpolation (default: linear)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Downscale the image by this factor before rotating (default: 1.0)')
+    parser.add_argument('--max-size', type=int,
+                        help='Downscale so the longer side is at most this many pixels')
+    parser.add_argument('--preview', action='store_true',
+                        help=f'Quick preview: at most {PREVIEW_FPS} fps, nearest-neighbour warps '
+                             f'and a {PREVIEW_MAX_SIZE}px size cap unless --max-size is given')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of threads used to render frames (default: 1)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Overlap frame rendering and encoding on separate threads')
+    parser.add_argument('--frame-cache-mb', type=float, default=0,
+                        help='Reuse frames whose angles match modulo 360 degrees, '
+                             'keeping up to this many MB of frames (default: 0, disabled)')
+    parser.add_argument('--cache-tolerance', type=float, default=None,
+                        help='Angle tolerance in degrees for frame reuse (default: half a pixel at the corners)')
+    parser.add_argument('--remap-cache-mb', type=float, default=0,
+                        help='Warp through precomputed remap tables, keeping up to this many MB '
+                             'of tables. Usually slower than the default warpAffine (about 2x for '
+                             'nearest at 1080p) and interpolated pixels differ slightly; only worth '
+                             'it if benchmark.py --warps shows a win on your machine '
+                             '(default: 0, disabled)')
+    parser.add_argument('--remap-cache-dir',
+                        help='Also store remap tables here so later runs can reuse them')
+    parser.add_argument('--timing', action='store_true',
+                        help='Print time spent in each stage')
     args = parser.parse_args()
+    if args.cache_tolerance is not None and not 0 < args.cache_tolerance <= 360:
+        parser.error(f"--cache-tolerance must be in (0, 360] degrees, got {args.cache_tolerance}")
+    if args.preview:
+        args.fps = min(args.fps, PREVIEW_FPS)
+        args.interpolation = 'nearest'
+        if args.max_size is None:
+            args.max_size = PREVIEW_MAX_SIZE
+    encoder_options = {name: value for name, value in
+                       (('codec', args.codec), ('preset', args.preset),
+                        ('threads', args.threads), ('pix_fmt', args.pix_fmt))
+                       if value is not None}
+    unsupported = set(encoder_options) - ENCODER_OPTIONS[args.encoder]
+    if unsupported:
+        parser.error(f"--encoder {args.encoder} does not support: "
+                     f"{', '.join('--' + name.replace('_', '-') for name in sorted(unsupported))}")
+    options = dict(workers=args.workers, pipeline=args.pipeline, curve=args.curve,
+                   encoder=args.encoder, encoder_options=encoder_options,
+                   interpolation=INTERPOLATIONS[args.interpolation], scale=args.scale,
+                   max_size=args.max_size)
+    if args.remap_cache_mb:
+        options['remap_cache'] = RemapCache(int(args.remap_cache_mb * 1024 * 1024),
+                                            args.remap_cache_dir)
+    frame_cache_bytes = int(args.frame_cache_mb * 1024 * 1024)
+
+    if args.batch:
+        results = create_rotating_videos(args.input_image, args.output_video, args.duration,
+                                         args.fps, frame_cache_bytes=frame_cache_bytes,
+                                         cache_tolerance=args.cache_tolerance, **options)
+        print(f"Rendered {len(results['rendered'])}, copied {len(results['copied'])}, "
+              f"skipped {len(results['skipped'])} videos in {args.output_video}")
+        return
     
-    create_rotating_video(args.input_image, args.output_video)
+    frame_cache = FrameCache(frame_cache_bytes, args.cache_tolerance) if frame_cache_bytes else None
+    timings = create_rotating_video(args.input_image, args.output_video, args.duration, args.fps,
+                                    frame_cache=frame_cache, **options)
     print(f"Video created successfully at {args.output_video}")
+    if args.timing:
+        print(', '.join(f"{stage}: {seconds:.3f}s" for stage, seconds in timings.items()))
+    if frame_cache is not None:
+        print(f"Frame cache: {frame_cache.hits} hits, {frame_cache.misses} misses "
+              f"({frame_cache.hit_rate:.1%} hit rate)")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file